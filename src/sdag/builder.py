@@ -1,6 +1,10 @@
 from __future__ import annotations
 from sdag.dag import DAG
 from sdag.node import _Node, Task, Branch
+from sdag.exceptions import DAGBuildError
+from typing import Any, Iterable
+from uuid import UUID
+import networkx as nx
 
 class DAGBuilder:
     dag: DAG
@@ -27,8 +31,6 @@ class DAGBuilder:
             )
             
         self.dag._add_upstream(self.prev, task)
-        
-        task.deps = [*self.prev.deps, self.prev.id]
         task.place()
 
         return DAGBuilder(dag=self.dag, prev=task)
@@ -43,8 +45,6 @@ class DAGBuilder:
             )
 
         self.dag._add_upstream(self.prev, condition)
-
-        condition.deps = [*self.prev.deps, self.prev.id]
         condition.place()
         
         return [
@@ -52,8 +52,13 @@ class DAGBuilder:
             for _ in range(n_branches)
         ]
 
-    def finalize(self) -> DAG:
-        
+    def finalize(self, fuse: bool = False) -> DAG:
+        """
+            Prepares the DAG to run. With `fuse`, chains
+            of tasks that each have a single parent and a
+            single child run as one executor submission.
+        """
+        self.dag._finalize(fuse=fuse)
         return self.dag
 
 
@@ -74,10 +79,155 @@ def join(junction: Task, branches: list[DAGBuilder]) -> DAGBuilder:
             raise ValueError(f"Branches need a root node in order to join")
 
         b.dag._add_upstream(b.prev, junction)
-        junction.deps = [*junction.deps, *b.prev.deps, b.prev.id]
 
 
     junction.place()
 
     return DAGBuilder(dag=branches[0].dag, prev=junction)
     
+
+
+def from_edges(
+    dag: DAG,
+    edges: Iterable[tuple[_Node, _Node]],
+    tasks: Iterable[_Node] = (),
+    roots: Iterable[_Node] | None = None,
+    fuse: bool = False,
+) -> DAG:
+    """
+        Builds `dag` from (upstream, downstream) pairs in
+        O(V+E). `tasks` adds nodes without edges. Roots
+        default to the nodes with no upstream tasks;
+        if given, every node must be reachable from them.
+        Raises DAGBuildError on cycles, duplicate edges,
+        or unreachable nodes.
+    """
+    nodes: dict[UUID, _Node] = {}
+    adj: dict[UUID, list[UUID]] = {}
+    in_degree: dict[UUID, int] = {}
+    seen_edges: set[tuple[UUID, UUID]] = set()
+
+    def add(node: _Node) -> None:
+        if node.id in nodes:
+            return
+        if node.placed:
+            raise ValueError(
+                f"Task {node.name} has already been placed in a DAG."
+            )
+        nodes[node.id] = node
+        adj[node.id] = []
+        in_degree[node.id] = 0
+
+    for t in tasks:
+        add(t)
+
+    for upstream, downstream in edges:
+        add(upstream)
+        add(downstream)
+        if (upstream.id, downstream.id) in seen_edges:
+            raise DAGBuildError(
+                f"Duplicate edge {upstream.name} -> {downstream.name}"
+            )
+        seen_edges.add((upstream.id, downstream.id))
+        adj[upstream.id].append(downstream.id)
+        in_degree[downstream.id] += 1
+
+    order = _topological_order(nodes, adj, in_degree)
+
+    if roots is None:
+        root_ids = [t for t in nodes if in_degree[t] == 0]
+    else:
+        root_ids = [r.id for r in roots]
+        _check_roots(nodes, adj, in_degree, root_ids)
+
+    for r in root_ids:
+        dag._add_root(nodes[r])
+        nodes[r].place()
+
+    for t in order:
+        for c in adj[t]:
+            dag._add_upstream(nodes[t], nodes[c])
+            nodes[c].place()
+
+    dag._finalize(fuse=fuse)
+    return dag
+
+
+def from_networkx(
+    dag: DAG,
+    graph: nx.DiGraph,
+    roots: Iterable[_Node] | None = None,
+    fuse: bool = False,
+) -> DAG:
+    """
+        Builds `dag` from a networkx DiGraph whose nodes
+        are tasks, or carry one under the "task" attribute.
+    """
+    def task(n: Any) -> _Node:
+        return n if isinstance(n, _Node) else graph.nodes[n]["task"]
+
+    return from_edges(
+        dag,
+        edges=((task(u), task(v)) for u, v in graph.edges),
+        tasks=(task(n) for n in graph.nodes),
+        roots=roots,
+        fuse=fuse,
+    )
+
+
+def _topological_order(
+    nodes: dict[UUID, _Node],
+    adj: dict[UUID, list[UUID]],
+    in_degree: dict[UUID, int],
+) -> list[UUID]:
+    """Kahn's algorithm, raising if there is a cycle."""
+    remaining = dict(in_degree)
+    order = [t for t in nodes if remaining[t] == 0]
+    for t in order:
+        for c in adj[t]:
+            remaining[c] -= 1
+            if remaining[c] == 0:
+                order.append(c)
+
+    if len(order) < len(nodes):
+        cyclic = [nodes[t].name for t in nodes if remaining[t] > 0]
+        raise DAGBuildError(
+            f"Graph has a cycle through: {_names(cyclic)}"
+        )
+    return order
+
+
+def _check_roots(
+    nodes: dict[UUID, _Node],
+    adj: dict[UUID, list[UUID]],
+    in_degree: dict[UUID, int],
+    roots: list[UUID],
+) -> None:
+    for r in roots:
+        if r not in nodes:
+            raise DAGBuildError("Roots must be part of the graph")
+        if in_degree[r] != 0:
+            raise DAGBuildError(
+                f"Root {nodes[r].name} has upstream tasks"
+            )
+
+    reached = set(roots)
+    stack = list(roots)
+    while stack:
+        for c in adj[stack.pop()]:
+            if c not in reached:
+                reached.add(c)
+                stack.append(c)
+
+    if len(reached) < len(nodes):
+        unreachable = [nodes[t].name for t in nodes if t not in reached]
+        raise DAGBuildError(
+            f"Tasks not reachable from the roots: {_names(unreachable)}"
+        )
+
+
+def _names(names: list[str], limit: int = 10) -> str:
+    shown = ", ".join(names[:limit])
+    if len(names) > limit:
+        shown += f" and {len(names) - limit} more"
+    return shown
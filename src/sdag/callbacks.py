@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable
+import logging
+
+
+class CallbackLane:
+    """
+        Runs on_success and on_error callbacks outside
+        the task executor, so they never take a worker
+        slot or get shipped to another process.
+
+        With `workers=0` callbacks run inline on the
+        scheduler thread. Otherwise they run on a small
+        thread pool, one batch per scheduling pass. A
+        failing callback is logged and doesn't affect
+        the DAG.
+    """
+    _pool: ThreadPoolExecutor | None
+    _pending: list[Future]
+
+    def __init__(self, workers: int = 0) -> None:
+        if workers < 0:
+            raise ValueError("Workers cannot be negative")
+        self._pool = (
+            ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="sdag-callbacks",
+            )
+            if workers else None
+        )
+        self._pending = []
+
+    def dispatch(self, batch: list[Callable[[], None]]) -> None:
+        if not batch:
+            return
+        if self._pool is None:
+            _run_batch(batch)
+            return
+
+        self._pending = [f for f in self._pending if not f.done()]
+        self._pending.append(self._pool.submit(_run_batch, batch))
+
+    def wait(self) -> None:
+        """Blocks until every dispatched callback has run."""
+        for f in self._pending:
+            f.result()
+        self._pending = []
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+def _run_batch(batch: list[Callable[[], None]]) -> None:
+    for callback in batch:
+        try:
+            callback()
+        except Exception:
+            logging.exception("Callback failed")
@@ -1,9 +1,20 @@
 from __future__ import annotations
-from sdag.state import TaskState
-from sdag.node import _Node, Task
+from sdag.state import TaskState, FINISHED_STATES
+from sdag.node import _Node, _Group, Task, Branch
+from sdag.stream import _Pipeline
+from sdag.fusion import _Chain
 from sdag.executors import Executor
-from sdag.result import TaskResult, BranchResult
+from sdag.result import Result, TaskResult, BranchResult, GroupResult, RunResult
+from sdag.exceptions import DAGBuildError
+from sdag.resources import Capacity, _Admission
+from sdag.callbacks import CallbackLane
+from sdag.serialization import Serializer
+from sdag.runs import _Multiplexer, _RunExecutor
 from collections import deque
+from functools import partial
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, Iterator, Any
+import os
 from uuid import UUID
 import logging
 
@@ -19,13 +30,57 @@ class DAG:
     _states: dict[UUID, TaskState]
     _roots: list[UUID]
     _executor: Executor
-    _queue: deque = deque()
+    _queue: deque
+    _admission: _Admission
+    _callbacks: CallbackLane
+    _callback_batch: list[Callable[[], None]]
+    _serializer: Serializer | None
+    _groups: dict[UUID, _Group]
+    _routes: dict[UUID, dict[str, list[UUID]]]
+    _pruned: dict[UUID, dict[str | None, tuple[list[UUID], list[UUID]]]]
+    _finalized: bool
+    _run: int | None
+    _release_outputs: bool
+    _spill_dir: Path | None
+    _consumers: dict[UUID, int]
+    _refs: dict[UUID, int]
+    _started: set[UUID]
+    _cut: dict[UUID, set[UUID]]
     
-    def __init__(self, executor: Executor) -> None:
+    def __init__(
+        self,
+        executor: Executor,
+        capacity: Capacity | None = None,
+        callbacks: CallbackLane | None = None,
+        serializer: Serializer | None = None,
+        release_outputs: bool = False,
+        spill_dir: str | os.PathLike | None = None,
+    ) -> None:
+        if spill_dir is not None and not release_outputs:
+            raise ValueError("Outputs are only spilled when release_outputs is set")
+
         self._adj = {}
         self._roots = []
         self._tasks = {}
         self._executor = executor
+        self._queue = deque()
+        self._admission = _Admission(
+            capacity if capacity is not None else Capacity()
+        )
+        self._callbacks = callbacks if callbacks is not None else CallbackLane()
+        self._callback_batch = []
+        self._serializer = serializer
+        self._groups = {}
+        self._routes = {}
+        self._pruned = {}
+        self._finalized = False
+        self._run = None
+        self._release_outputs = release_outputs
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._consumers = {}
+        self._refs = {}
+        self._started = set()
+        self._cut = {}
 
     def _add_root(self, task: Task) -> None:
         if task.id in self._adj:
@@ -35,28 +90,377 @@ class DAG:
         self._adj[task.id] = []
         self._roots.append(task.id)
         self._tasks[task.id] = task
+        self._finalized = False
     
     def _add_upstream(self, upstream: _Node, downstream: _Node) -> None:
         self._adj[upstream.id].append(downstream.id)
-        self._tasks[downstream.id].deps = (
-            self._tasks[upstream.id].deps 
-            + [upstream.id]
-        )
         if downstream.id not in self._adj:
             self._adj[downstream.id] = []
         self._tasks[downstream.id] = downstream
+        downstream.add_upstream(upstream.id)
+        self._finalized = False
+
+    def _finalize(self, fuse: bool = False) -> None:
+        """
+            Derives the lookup structures the scheduler
+            needs once the DAG is fully built. With `fuse`,
+            linear chains of tasks are also fused so each
+            chain costs one executor round-trip.
+        """
+        self._groups = {}
+        self._find_pipelines()
+        if fuse:
+            self._fuse_chains()
+        self._index_branches()
+        self._consumers = {
+            t: len(dict.fromkeys(children))
+            for t, children in self._adj.items()
+            if children
+        }
+        self._finalized = True
+
+    def _index_branches(self) -> None:
+        """
+            For every branch, maps each returned name to
+            the children it picks, and precomputes what
+            each choice prunes: the tasks that become
+            unreachable, and the tasks below them that
+            still have other upstream tasks.
+        """
+        self._routes = {}
+        self._pruned = {}
+        for b, node in self._tasks.items():
+            if not isinstance(node, Branch):
+                continue
+
+            routes: dict[str, list[UUID]] = {}
+            for c in self._adj[b]:
+                routes.setdefault(self._tasks[c].name, []).append(c)
+            self._routes[b] = routes
+
+            self._pruned[b] = {
+                name: self._prune(b, [
+                    c for c in dict.fromkeys(self._adj[b])
+                    if c not in picked
+                ])
+                for name, picked in routes.items()
+            }
+            self._pruned[b][None] = self._prune(
+                b, list(dict.fromkeys(self._adj[b]))
+            )
+
+    def _prune(
+        self,
+        branch: UUID,
+        start: list[UUID],
+    ) -> tuple[list[UUID], list[UUID]]:
+        """
+            Returns the tasks skipped when `branch` doesn't
+            pick the children in `start`, and the frontier
+            of tasks left for their policy to decide.
+
+            Children in `start` are skipped unless they have
+            other upstream tasks. Below them, a task is only
+            skipped once all its upstream tasks are, and if
+            its policy can't be met that way, as `_skip`
+            would decide.
+        """
+        pruned_parents: dict[UUID, int] = {
+            c: self._tasks[c].deps.count(branch) for c in start
+        }
+        skipped = [
+            c for c in start
+            if pruned_parents[c] == len(self._tasks[c].deps)
+        ]
+        for t in skipped:
+            for c in self._adj[t]:
+                pruned_parents[c] = pruned_parents.get(c, 0) + 1
+                deps = self._tasks[c].deps
+                if (
+                    pruned_parents[c] == len(deps)
+                    and not self._tasks[c].policy([TaskState.SKIPPED] * len(deps))
+                ):
+                    skipped.append(c)
+
+        skipped_set = set(skipped)
+        frontier = [c for c in pruned_parents if c not in skipped_set]
+        return skipped, frontier
+
+    def _find_pipelines(self) -> None:
+        """
+            Groups chains of streaming tasks into
+            pipelines that run as a single unit.
+        """
+        for t, node in self._tasks.items():
+            if not (isinstance(node, Task) and node.takes_stream):
+                continue
+            parents = node.deps
+            if (
+                len(parents) != 1
+                or not self._is_streaming(parents[0])
+                or len(self._adj[parents[0]]) != 1
+            ):
+                raise DAGBuildError(
+                    f"Task {node.name} takes a stream, so it must be "
+                    "the only child of a single streaming task"
+                )
+
+        for t, node in self._tasks.items():
+            if not self._is_streaming(t) or node.takes_stream:
+                continue
+            stages = [node]
+            while (
+                len(self._adj[stages[-1].id]) == 1
+                and self._tasks[self._adj[stages[-1].id][0]].takes_stream
+            ):
+                stages.append(self._tasks[self._adj[stages[-1].id][0]])
+            if len(stages) > 1:
+                self._groups[t] = _Pipeline(stages)
+
+    def _fuse_chains(self) -> None:
+        """
+            Fuses runs of plain tasks where each task is the
+            only child of the one before it. Branches,
+            streaming tasks and tasks with a timeout keep
+            their own submissions.
+        """
+        grouped = {m for g in self._groups.values() for m in g.ids}
+
+        def fusable(t: UUID) -> bool:
+            node = self._tasks[t]
+            return (
+                isinstance(node, Task)
+                and not node.streaming
+                and node.timeout is None
+                and t not in grouped
+            )
+
+        def next_in_chain(t: UUID) -> UUID | None:
+            if len(self._adj[t]) != 1:
+                return None
+            c = self._adj[t][0]
+            if fusable(c) and self._tasks[c].deps == [t]:
+                return c
+            return None
+
+        for t, node in self._tasks.items():
+            if not fusable(t):
+                continue
+            if (
+                len(node.deps) == 1
+                and fusable(node.deps[0])
+                and next_in_chain(node.deps[0]) == t
+            ):
+                # Part of the chain started by an upstream task
+                continue
+
+            chain = [t]
+            while (c := next_in_chain(chain[-1])) is not None:
+                chain.append(c)
+            if len(chain) > 1:
+                self._groups[t] = _Chain([self._tasks[m] for m in chain])
+
+    def ancestors(self, task: UUID) -> set[UUID]:
+        """
+            All tasks upstream of `task`, derived from
+            each node's direct dependencies.
+        """
+        seen: set[UUID] = set()
+        stack = list(self._tasks[task].deps)
+        while stack:
+            t = stack.pop()
+            if t not in seen:
+                seen.add(t)
+                stack.extend(self._tasks[t].deps)
+        return seen
+
+    def _is_streaming(self, task: UUID) -> bool:
+        node = self._tasks[task]
+        return isinstance(node, Task) and node.streaming
 
     def _initialize_tasks(self) -> None:
+        self._check_resources()
+        self._reset_states()
+
+    def _check_resources(self) -> None:
+        for t in self._tasks:
+            self._admission.check(
+                self._tasks[t].name, self._tasks[t].resources
+            )
+        for t, g in self._groups.items():
+            self._admission.check(self._tasks[t].name, g.resources)
+
+    def _reset_states(self) -> None:
         for t in self._tasks:
             self._tasks[t].state = TaskState.AWAITING_UPSTREAM
-            
+            if self._tasks[t].deps:
+                self._tasks[t].clear_input()
+
         for r in self._roots:
             self._tasks[r].state = TaskState.READY
 
+        self._refs = dict(self._consumers)
+        self._started = set()
+        self._cut = {}
+
     def run(self) -> None:
+        if not self._finalized:
+            self._finalize()
         self._initialize_tasks()
         self._queue.extend(self._roots)
         self._bf_exec()
+        self._callbacks.wait()
+
+    def run_many(
+        self,
+        inputs: Iterable[dict[str, Any]],
+        max_concurrent_runs: int = 8,
+    ) -> Iterator[RunResult]:
+        """
+            Runs the DAG once per item of `inputs`, each
+            item being the input of every root task. Up to
+            `max_concurrent_runs` runs are scheduled at once
+            and their tasks share the executor, so one run's
+            tasks fill the slots another leaves idle.
+
+            Yields a RunResult as each run completes, which
+            may differ from the order of `inputs`. Inputs
+            are only read as earlier runs make room. If
+            iteration stops early, tasks already submitted
+            are waited for and their results discarded.
+
+            On a threaded CallbackLane, a run's callbacks
+            may still be running when its RunResult is
+            yielded. All of them have run once iteration
+            ends.
+        """
+        if max_concurrent_runs < 1:
+            raise ValueError("At least one run must be allowed at a time")
+        if not self._finalized:
+            self._finalize()
+        self._check_resources()
+
+        mux = _Multiplexer(self._executor)
+        pending = enumerate(inputs)
+        active: dict[int, tuple[DAG, dict[str, Any]]] = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(active) < max_concurrent_runs:
+                    nxt = next(pending, None)
+                    if nxt is None:
+                        exhausted = True
+                        break
+                    i, record = nxt
+                    run = self._clone(_RunExecutor(mux, i), i)
+                    run._start(record)
+                    active[i] = (run, record)
+
+                if not active:
+                    return
+
+                for run, _ in active.values():
+                    run._submit_tasks()
+                mux.poll()
+                for i, (run, record) in list(active.items()):
+                    run._poll_finished()
+                    if not run._queue:
+                        del active[i]
+                        yield run._run_result(i, record)
+        finally:
+            # Runs left unfinished when the caller stops early
+            # still have tasks on the shared executor
+            mux.drain()
+            for run, _ in active.values():
+                for t, node in run._tasks.items():
+                    if node.state == TaskState.RUNNING:
+                        self._admission.release(run._slot(t))
+            self._callbacks.wait()
+
+    def _clone(self, executor: Executor, run: int) -> DAG:
+        """
+            A copy of this finalized DAG for one run of
+            `run_many`. The graph and the lookups derived
+            from it are shared, only the nodes are copied.
+            Resources are admitted against this DAG's
+            capacity.
+        """
+        dag = DAG(
+            executor=executor,
+            callbacks=self._callbacks,
+            serializer=self._serializer,
+            release_outputs=self._release_outputs,
+            spill_dir=self._spill_dir,
+        )
+        dag._adj = self._adj
+        dag._roots = self._roots
+        dag._tasks = {t: n._copy() for t, n in self._tasks.items()}
+        dag._groups = {
+            t: type(g)([dag._tasks[m] for m in g.ids])
+            for t, g in self._groups.items()
+        }
+        dag._routes = self._routes
+        dag._pruned = self._pruned
+        dag._consumers = self._consumers
+        dag._admission = self._admission
+        dag._finalized = True
+        dag._run = run
+        return dag
+
+    def _start(self, record: dict[str, Any]) -> None:
+        self._reset_states()
+        for r in self._roots:
+            self._tasks[r].input = TaskResult(id=r, value=record)
+        self._queue.extend(self._roots)
+
+    def _run_result(self, index: int, record: dict[str, Any]) -> RunResult:
+        return RunResult(
+            index=index,
+            input=record,
+            states={t: n.state for t, n in self._tasks.items()},
+            outputs={
+                t: n.output for t, n in self._tasks.items()
+                if not n.spilled and n.output is not None
+            },
+        )
+
+    def _slot(self, task: UUID) -> Hashable:
+        """Key under which a task holds its resources."""
+        return task if self._run is None else (self._run, task)
+
+    def _consume(self, task: UUID) -> None:
+        """
+            Counts `task` as started for each of its
+            upstream tasks, and releases the outputs
+            whose last consumer this was.
+        """
+        if not self._release_outputs or task in self._started:
+            return
+        self._started.add(task)
+        for t in dict.fromkeys(self._tasks[task].deps):
+            self._refs[t] -= 1
+            self._try_release(t)
+
+    def _try_release(self, task: UUID) -> None:
+        """
+            Frees a finished task's output once every
+            downstream task has started. Sinks have no
+            count and, like retained tasks, keep theirs.
+        """
+        node = self._tasks[task]
+        if (
+            self._refs.get(task) != 0
+            or node.retain
+            or node.state not in (TaskState.SUCCESS, TaskState.FAILED)
+        ):
+            return
+        del self._refs[task]
+
+        path = None
+        if self._spill_dir is not None:
+            prefix = "" if self._run is None else f"{self._run}-"
+            path = self._spill_dir / f"{prefix}{task}.pkl"
+        node.release_output(path)
                 
     def _bf_exec(self) -> None:
         """
@@ -73,16 +477,39 @@ class DAG:
         """
             Grabs ready tasks from the queue
             and submits them to the executor.
+            Tasks that don't fit in the remaining
+            capacity stay queued, and tasks whose
+            policy can no longer be met are skipped.
         """
         exec_q = [
             t for t in self._queue
             if self._can_run(t)
         ]
         for t in exec_q:
+            unit = self._groups.get(t, self._tasks[t])
+            members = unit.ids if isinstance(unit, _Group) else [t]
+            if not self._admission.try_acquire(self._slot(t), unit.resources):
+                continue
             self._executor.submit(
-                self._tasks[t].run
+                unit.run,
+                timeout=unit.timeout,
+                fallback=unit.fail,
+                serializer=(
+                    unit.serializer
+                    if unit.serializer is not None
+                    else self._serializer
+                ),
             )
-            self._tasks[t].state = TaskState.RUNNING
+            for m in members:
+                self._tasks[m].state = TaskState.RUNNING
+                self._consume(m)
+
+        skip_q = [
+            t for t in self._queue
+            if self._can_skip(t)
+        ]
+        for t in skip_q:
+            self._skip(t)
 
     def _can_run(self, task: UUID) -> bool:
         """
@@ -92,10 +519,57 @@ class DAG:
         """
         return (
             self._tasks[task].state == TaskState.READY and
-            self._tasks[task].policy(
-                [self._tasks[t].state for t in self._tasks[task].deps]
+            self._tasks[task].policy(self._dep_states(task))
+        )
+
+    def _dep_states(self, task: UUID) -> list[TaskState]:
+        """
+            States of a task's dependencies, where a branch
+            that didn't pick the task counts as SKIPPED.
+        """
+        cut = self._cut.get(task, ())
+        return [
+            TaskState.SKIPPED if t in cut else self._tasks[t].state
+            for t in self._tasks[task].deps
+        ]
+
+    def _can_skip(self, task: UUID) -> bool:
+        """
+            A ready task is skipped once all of its
+            dependencies have finished without
+            satisfying its policy.
+        """
+        return (
+            self._tasks[task].state == TaskState.READY and
+            all(
+                self._tasks[t].state in FINISHED_STATES
+                for t in self._tasks[task].deps
             )
+            and not self._can_run(task)
         )
+
+    def _skip(self, task: UUID) -> None:
+        """
+            Marks a task as skipped and releases its
+            downstream tasks so their own policies
+            can be evaluated.
+        """
+        self._tasks[task].state = TaskState.SKIPPED
+        self._queue.remove(task)
+        self._consume(task)
+        if self._release_outputs and self._tasks[task].deps:
+            self._tasks[task].clear_input()
+        for t in self._adj[task]:
+            self._release(t)
+
+    def _release(self, task: UUID) -> None:
+        """
+            Queues a downstream task the first time
+            one of its upstream tasks finishes.
+        """
+        if self._tasks[task].state == TaskState.AWAITING_UPSTREAM:
+            self._tasks[task].state = TaskState.READY
+            self._queue.append(task)
     
     def _poll_finished(self) -> None:
         """
@@ -105,25 +579,62 @@ class DAG:
         finished = self._executor.poll()
 
         for f in finished:
-            self._tasks[f.id].output = f
-            if f.error is not None:
-                self._tasks[f.id].state = TaskState.FAILED
+            self._queue.remove(f.id)
+            if isinstance(f, GroupResult):
+                self._finish_group(f)
             else:
-                self._tasks[f.id].state = TaskState.SUCCESS
+                self._finish(f)
 
-            if isinstance(f, TaskResult):
-                self._handle_task_result(f)
-            elif isinstance(f, BranchResult):
-                self._handle_branch_result(f)
+        batch, self._callback_batch = self._callback_batch, []
+        self._callbacks.dispatch(batch)
 
-            self._queue.remove(f.id)
-            if (
-                self._tasks[f.id].state == TaskState.FAILED 
-                and self._tasks[f.id].has_error_callback
-            ):
-                self._executor.submit(self._tasks[f.id].on_error)
-            elif self._tasks[f.id].has_success_callback:
-                self._executor.submit(self._tasks[f.id].on_success)
+    def _finish_group(self, res: GroupResult) -> None:
+        """
+            Handles each member's result in order. Members
+            that didn't run are queued again so their
+            policy decides whether they're skipped.
+        """
+        self._admission.release(self._slot(res.id))
+        for r in res.results:
+            self._finish(r)
+
+        for t in self._groups[res.id].ids:
+            if self._tasks[t].state == TaskState.RUNNING:
+                self._tasks[t].state = TaskState.READY
+                self._queue.append(t)
+
+    def _finish(self, f: Result) -> None:
+        """
+            Records a task's result, then queues
+            downstream tasks and batches callbacks.
+        """
+        self._admission.release(self._slot(f.id))
+        self._tasks[f.id].output = f
+        if f.error is not None:
+            self._tasks[f.id].state = TaskState.FAILED
+        else:
+            self._tasks[f.id].state = TaskState.SUCCESS
+
+        if isinstance(f, TaskResult):
+            self._handle_task_result(f)
+        elif isinstance(f, BranchResult):
+            self._handle_branch_result(f)
+
+        if (
+            self._tasks[f.id].state == TaskState.FAILED 
+            and self._tasks[f.id].has_error_callback
+        ):
+            self._callback_batch.append(partial(self._tasks[f.id].on_error, f))
+        elif (
+            self._tasks[f.id].state == TaskState.SUCCESS
+            and self._tasks[f.id].has_success_callback
+        ):
+            self._callback_batch.append(partial(self._tasks[f.id].on_success, f))
+
+        if self._release_outputs:
+            if self._tasks[f.id].deps:
+                self._tasks[f.id].clear_input()
+            self._try_release(f.id)
     
     def _handle_task_result(self, res: TaskResult) -> None:
         """
@@ -131,31 +642,35 @@ class DAG:
             tasks that are downstream.
         """
         for t in self._adj[res.id]:
-            self._tasks[t].input = res
-            if self._tasks[res.id].state == TaskState.SUCCESS:
-                self._tasks[t].state = TaskState.READY
-            else:
-                self._tasks[t].state = TaskState.SKIPPED
-            self._queue.append(t)
+            if t not in self._started:
+                self._tasks[t].add_input(res)
+            self._release(t)
 
     def _handle_branch_result(self, res: BranchResult) -> None:
         """
             Handles a finished branch task, queuing up
-            the task with a name matching the branch's
-            returned string.
-        """
-        if self._tasks[res.id].state == TaskState.SUCCESS:
-            # Just playing it safe in case there are
-            # multiple tasks with the same name
-            picked = [
-                t for t in self._adj[res.id] 
-                if self._tasks[t].name == res.value
-            ]
-            for t in picked:
-                self._tasks[t].input = self._tasks[res.id].input
-                self._tasks[t].state = TaskState.READY
-                self._queue.append(t)
-        else:
-            for t in self._adj[res.id]:
+            the tasks with a name matching the branch's
+            returned string, which for a failed branch
+            is its error branch. Everything only reachable
+            through the other children is skipped at once,
+            and joins below them are queued so their policy
+            can be evaluated, counting the branch as SKIPPED
+            for children it didn't pick.
+        """
+        picked = self._routes[res.id].get(res.value, [])
+        for t in picked:
+            self._tasks[t].inherit_input(self._tasks[res.id])
+            self._release(t)
+        for t in self._adj[res.id]:
+            if t not in picked:
+                self._cut.setdefault(t, set()).add(res.id)
+
+        pruned = self._pruned[res.id]
+        skipped, frontier = pruned.get(res.value, pruned[None])
+        for t in skipped:
+            if self._tasks[t].state == TaskState.AWAITING_UPSTREAM:
                 self._tasks[t].state = TaskState.SKIPPED
+                self._consume(t)
+        for t in frontier:
+            self._release(t)
 
@@ -0,0 +1,538 @@
+from sdag.result import Result
+from sdag.exceptions import TaskTimeoutError
+from sdag.executors import Executor, _Deadline
+from sdag.serialization import (
+    Serializer,
+    SerializationStats,
+    DEFAULT_SERIALIZER,
+    _Payload,
+)
+from multiprocessing.connection import Listener, Client, Connection
+from multiprocessing import AuthenticationError
+from dataclasses import dataclass, field
+from collections import deque
+from itertools import count
+from typing import Callable, Any
+import multiprocess
+import threading
+import argparse
+import logging
+import queue
+import dill
+import time
+import os
+
+Address = tuple[str, int] | str
+
+
+def _send(conn: Connection, msg: tuple[Any, ...]) -> None:
+    conn.send_bytes(dill.dumps(msg))
+
+
+def _recv(conn: Connection) -> tuple[Any, ...]:
+    return dill.loads(conn.recv_bytes())
+
+
+def _send_payload(conn: Connection, payload: _Payload) -> None:
+    """
+        Sends the pickle stream and each out-of-band
+        buffer as their own frames, so buffers are
+        written straight to the socket.
+    """
+    conn.send_bytes(payload.data)
+    for b in payload.buffers:
+        conn.send_bytes(b)
+
+
+def _recv_payload(conn: Connection, serializer: Serializer, n: int) -> _Payload:
+    data = conn.recv_bytes()
+    return _Payload(serializer, data, [conn.recv_bytes() for _ in range(n)])
+
+
+@dataclass
+class _Job:
+    token: int
+    payload: _Payload
+    timeout: float | None = None
+    fallback: Callable[[Exception], Result] | None = None
+    worker: int | None = None
+    started: float | None = None
+
+
+@dataclass
+class _Worker:
+    id: int
+    conn: Connection
+    pid: int | None = None
+    assigned: list[int] = field(default_factory=list)
+    last_seen: float = field(default_factory=time.monotonic)
+    stealing: bool = False
+
+
+class DistributedExecutor(Executor):
+    """
+        Coordinator that spreads tasks over worker
+        processes connected through a TCP or Unix socket.
+
+        Workers can run on any host that can reach
+        `address` and knows `authkey`, see `run_worker`,
+        or be started locally with `spawn_workers`.
+        Each worker is sent up to `prefetch` tasks ahead;
+        idle workers steal queued tasks from busy ones.
+        Workers that stop sending heartbeats are dropped
+        and their tasks are sent to other workers, so a
+        task may run more than once.
+
+        Tasks and results are serialized with
+        `serializer`, with out-of-band buffers sent as
+        separate frames. Totals are kept in `stats`.
+    """
+    _listener: Listener
+    _inbox: queue.Queue[tuple[int, tuple[Any, ...]]]
+    _workers: dict[int, _Worker]
+    _jobs: dict[int, _Job]
+    _backlog: deque[int]
+    _local: dict[int, multiprocess.Process]
+    _tokens: count
+    _prefetch: int
+    _heartbeat: float
+    _heartbeat_timeout: float
+    _grace: float
+    _closed: bool
+    _serializer: Serializer
+    _failed: list[Result]
+    stats: SerializationStats
+
+    def __init__(
+        self,
+        address: Address = ("127.0.0.1", 0),
+        authkey: bytes | None = None,
+        prefetch: int = 2,
+        heartbeat: float = 1.0,
+        heartbeat_timeout: float = 5.0,
+        kill_grace: float = 1.0,
+        serializer: Serializer | None = None,
+    ) -> None:
+        if prefetch < 1:
+            raise ValueError("Workers must be able to hold at least one task")
+
+        self.authkey = authkey if authkey is not None else os.urandom(16)
+        self._listener = Listener(address, authkey=self.authkey)
+        self._inbox = queue.Queue()
+        self._workers = {}
+        self._jobs = {}
+        self._backlog = deque()
+        self._local = {}
+        self._tokens = count()
+        self._prefetch = prefetch
+        self._heartbeat = heartbeat
+        self._heartbeat_timeout = heartbeat_timeout
+        self._grace = kill_grace
+        self._closed = False
+        self._serializer = serializer if serializer is not None else DEFAULT_SERIALIZER
+        self._failed = []
+        self.stats = SerializationStats()
+
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def address(self) -> Address:
+        return self._listener.address
+
+    @property
+    def workers(self) -> int:
+        return len(self._workers)
+
+    def spawn_workers(self, n: int) -> None:
+        """Starts `n` worker processes on this host."""
+        for _ in range(n):
+            p = multiprocess.get_context("spawn").Process(
+                target=run_worker,
+                args=(self.address, self.authkey, self._heartbeat),
+                daemon=True,
+            )
+            p.start()
+            self._local[p.pid] = p
+
+    def wait_for_workers(self, n: int, timeout: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(self._workers) < n:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Only {len(self._workers)} of {n} workers joined")
+            self._process_inbox(block=True)
+
+    def submit(
+        self,
+        func: Callable[..., Result],
+        timeout: float | None = None,
+        fallback: Callable[[Exception], Result] | None = None,
+        serializer: Serializer | None = None,
+    ) -> None:
+        try:
+            payload = _Payload.dump(
+                serializer if serializer is not None else self._serializer,
+                func,
+                self.stats,
+            )
+        except Exception as e:
+            if fallback is None:
+                raise
+            self._failed.append(fallback(e))
+            return
+
+        token = next(self._tokens)
+        self._jobs[token] = _Job(
+            token=token,
+            payload=payload,
+            timeout=timeout,
+            fallback=fallback,
+        )
+        self._backlog.append(token)
+        self._dispatch()
+
+    def poll(self) -> list[Result]:
+        # Tasks that couldn't be serialized
+        finished, self._failed = self._failed, []
+        finished.extend(self._process_inbox(block=bool(self._jobs)))
+        finished.extend(self._check_health())
+        self._dispatch()
+        return finished
+
+    def empty(self) -> bool:
+        return len(self._jobs) == 0 and len(self._failed) == 0
+
+    def close(self) -> None:
+        self._closed = True
+        for w in list(self._workers.values()):
+            try:
+                _send(w.conn, ("stop",))
+            except OSError:
+                pass
+            w.conn.close()
+        self._workers = {}
+        self._listener.close()
+        for p in self._local.values():
+            p.join(timeout=self._heartbeat_timeout)
+            if p.is_alive():
+                p.kill()
+        self._local = {}
+
+    def _accept(self) -> None:
+        """
+            Accepts worker connections. Runs on its own
+            thread and only hands connections and messages
+            to the inbox, so the coordinator state is only
+            touched from `submit` and `poll`.
+        """
+        ids = count()
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                if self._closed:
+                    return
+                continue
+            except AuthenticationError:
+                logging.warning("Rejected a connection with a wrong authkey")
+                continue
+            except Exception:
+                logging.exception("Failed to accept a connection")
+                continue
+            wid = next(ids)
+            self._inbox.put((wid, ("joined", conn)))
+            threading.Thread(
+                target=self._read, args=(wid, conn), daemon=True
+            ).start()
+
+    def _read(self, wid: int, conn: Connection) -> None:
+        while True:
+            try:
+                msg = _recv(conn)
+                if msg[0] == "result" and msg[3]:
+                    # Loaded in `_handle`, which knows the serializer
+                    data = conn.recv_bytes()
+                    buffers = [conn.recv_bytes() for _ in range(msg[3] - 1)]
+                    msg = (*msg[:3], (data, buffers))
+            except (OSError, EOFError):
+                self._inbox.put((wid, ("lost",)))
+                return
+            self._inbox.put((wid, msg))
+
+    def _process_inbox(self, block: bool = False) -> list[Result]:
+        finished = []
+        try:
+            wid, msg = self._inbox.get(timeout=0.01) if block else self._inbox.get_nowait()
+        except queue.Empty:
+            return finished
+
+        while True:
+            res = self._handle(wid, msg)
+            if res is not None:
+                finished.append(res)
+            try:
+                wid, msg = self._inbox.get_nowait()
+            except queue.Empty:
+                return finished
+
+    def _handle(self, wid: int, msg: tuple[Any, ...]) -> Result | None:
+        kind = msg[0]
+        if kind == "joined":
+            self._workers[wid] = _Worker(id=wid, conn=msg[1])
+            return None
+
+        worker = self._workers.get(wid)
+        if worker is None:
+            # Late message from a dropped worker
+            return None
+        worker.last_seen = time.monotonic()
+
+        if kind == "hello":
+            worker.pid = msg[1]
+        elif kind == "started":
+            job = self._jobs.get(msg[1])
+            if job is not None:
+                job.started = time.monotonic()
+        elif kind == "result":
+            _, token, error, frames = msg
+            worker.assigned.remove(token)
+            job = self._jobs.pop(token)
+            if error is None:
+                data, buffers = frames
+                return _Payload(job.payload.serializer, data, buffers).load(self.stats)
+            if job.fallback is None:
+                raise error
+            return job.fallback(error)
+        elif kind == "released":
+            worker.stealing = False
+            for token in reversed(msg[1]):
+                worker.assigned.remove(token)
+                self._jobs[token].worker = None
+                self._backlog.appendleft(token)
+        elif kind == "lost":
+            self._drop(worker)
+        return None
+
+    def _check_health(self) -> list[Result]:
+        """
+            Drops workers that missed their heartbeats
+            and fails tasks that outlived their timeout.
+        """
+        now = time.monotonic()
+        finished = []
+        for w in list(self._workers.values()):
+            if now - w.last_seen > self._heartbeat_timeout:
+                logging.warning(f"Worker {w.id} missed its heartbeats")
+                self._drop(w, kill=True)
+                continue
+
+            for token in w.assigned:
+                job = self._jobs[token]
+                if (
+                    job.timeout is None
+                    or job.started is None
+                    or now - job.started <= job.timeout + self._grace
+                ):
+                    continue
+                logging.warning(f"Killing worker {w.id} after task timeout")
+                w.assigned.remove(token)
+                del self._jobs[token]
+                if job.fallback is not None:
+                    finished.append(job.fallback(
+                        TaskTimeoutError(
+                            f"Task exceeded its timeout of {job.timeout}s "
+                            "and its worker was killed"
+                        )
+                    ))
+                self._drop(w, kill=True)
+                break
+        return finished
+
+    def _drop(self, worker: _Worker, kill: bool = False) -> None:
+        """
+            Removes a worker and puts its tasks back
+            in front of the backlog. Local workers are
+            replaced.
+        """
+        del self._workers[worker.id]
+        if kill:
+            try:
+                _send(worker.conn, ("kill",))
+            except OSError:
+                pass
+        worker.conn.close()
+
+        for token in reversed(worker.assigned):
+            self._jobs[token].worker = None
+            self._jobs[token].started = None
+            self._backlog.appendleft(token)
+
+        p = self._local.pop(worker.pid, None)
+        if p is not None and not self._closed:
+            if kill:
+                p.kill()
+            self.spawn_workers(1)
+
+    def _dispatch(self) -> None:
+        """
+            Hands backlog tasks to the least loaded
+            workers, then lets idle workers steal.
+        """
+        while self._backlog:
+            open_workers = [
+                w for w in self._workers.values()
+                if len(w.assigned) < self._prefetch
+            ]
+            if not open_workers:
+                break
+            w = min(open_workers, key=lambda w: len(w.assigned))
+            job = self._jobs[self._backlog.popleft()]
+            job.worker = w.id
+            w.assigned.append(job.token)
+            try:
+                _send(w.conn, (
+                    "task",
+                    job.token,
+                    job.timeout,
+                    job.payload.serializer,
+                    len(job.payload.buffers),
+                ))
+                _send_payload(w.conn, job.payload)
+            except OSError:
+                self._drop(w)
+
+        if self._backlog:
+            return
+
+        idle = [w for w in self._workers.values() if not w.assigned]
+        if not idle:
+            return
+
+        victims = sorted(
+            (w for w in self._workers.values() if len(w.assigned) > 1 and not w.stealing),
+            key=lambda w: len(w.assigned),
+            reverse=True,
+        )
+        for victim in victims[:len(idle)]:
+            victim.stealing = True
+            try:
+                _send(victim.conn, ("steal", len(victim.assigned) // 2))
+            except OSError:
+                self._drop(victim)
+
+
+def run_worker(
+    address: Address,
+    authkey: bytes,
+    heartbeat: float = 1.0,
+) -> None:
+    """
+        Connects to a DistributedExecutor and runs the
+        tasks it sends until told to stop.
+    """
+    conn = Client(address, authkey=authkey)
+    lock = threading.Lock()
+    ready = threading.Condition()
+    local: deque[tuple[int, _Payload, float | None]] = deque()
+    stopping = threading.Event()
+
+    def send(msg: tuple[Any, ...], payload: _Payload | None = None) -> None:
+        with lock:
+            _send(conn, msg)
+            if payload is not None:
+                _send_payload(conn, payload)
+
+    def beat() -> None:
+        while not stopping.wait(heartbeat):
+            try:
+                send(("heartbeat",))
+            except OSError:
+                return
+
+    def receive() -> None:
+        while True:
+            try:
+                msg = _recv(conn)
+                if msg[0] == "task":
+                    _, token, timeout, serializer, n = msg
+                    payload = _recv_payload(conn, serializer, n)
+            except (OSError, EOFError):
+                msg = ("stop",)
+
+            if msg[0] == "task":
+                with ready:
+                    local.append((token, payload, timeout))
+                    ready.notify()
+            elif msg[0] == "steal":
+                with ready:
+                    released = [
+                        local.pop()[0]
+                        for _ in range(min(msg[1], len(local)))
+                    ]
+                send(("released", released[::-1]))
+            elif msg[0] == "kill":
+                os._exit(1)
+            elif msg[0] == "stop":
+                with ready:
+                    stopping.set()
+                    ready.notify()
+                return
+
+    send(("hello", os.getpid()))
+    threading.Thread(target=beat, daemon=True).start()
+    threading.Thread(target=receive, daemon=True).start()
+
+    while True:
+        with ready:
+            while not local and not stopping.is_set():
+                ready.wait()
+            if stopping.is_set():
+                break
+            token, payload, timeout = local.popleft()
+
+        send(("started", token))
+        res, error = None, None
+        try:
+            func = payload.load()
+            if timeout is not None:
+                func = _Deadline(func, timeout)
+            res = _Payload.dump(payload.serializer, func())
+        except Exception as e:
+            error = e
+
+        if error is None:
+            send(("result", token, None, len(res.buffers) + 1), res)
+        else:
+            send(("result", token, error, 0))
+
+    conn.close()
+
+
+def _parse_address(address: str) -> Address:
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run an sdag worker for a DistributedExecutor"
+    )
+    parser.add_argument(
+        "address", help="host:port or Unix socket path of the coordinator"
+    )
+    parser.add_argument(
+        "--authkey", required=True, help="Hex encoded authkey of the coordinator"
+    )
+    parser.add_argument("--heartbeat", type=float, default=1.0)
+    args = parser.parse_args()
+
+    run_worker(
+        _parse_address(args.address),
+        bytes.fromhex(args.authkey),
+        heartbeat=args.heartbeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
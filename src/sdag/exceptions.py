@@ -1,5 +1,9 @@
 class TaskExecError(Exception): ...
 
+class TaskTimeoutError(TaskExecError): ...
+
+class InputConflictError(TaskExecError): ...
+
 class TaskAttributeAccessError(Exception): ...
 
 class DAGBuildError(Exception): ...
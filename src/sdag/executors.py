@@ -1,12 +1,34 @@
 from sdag.node import _Node
 from sdag.result import Result
+from sdag.exceptions import TaskTimeoutError
+from sdag.serialization import (
+    Serializer,
+    SerializationStats,
+    DEFAULT_SERIALIZER,
+    _Payload,
+    _run_payload,
+)
 from pathos.pools import ProcessPool
+from multiprocess.queues import SimpleQueue
+from dataclasses import dataclass
 from typing import TypeVar, Protocol, Callable, Any
 from abc import ABC, abstractmethod
-from uuid import UUID
+from itertools import count
+from uuid import UUID, uuid4
+import multiprocess
+import threading
+import logging
+import signal
+import time
+import os
 
 T = TypeVar("T", covariant=True)
 
+# Set in pool workers by `_register_worker` so that timed
+# tasks can report which process picked them up.
+_STARTED: SimpleQueue | None = None
+
+
 class _PathosFuture(Protocol[T]):
     """Protocol for pathos Futures"""
 
@@ -15,14 +37,73 @@ class _PathosFuture(Protocol[T]):
     def ready(self) -> bool: ...
 
 
+def _register_worker(started: SimpleQueue) -> None:
+    global _STARTED
+    _STARTED = started
+
+
+class _Deadline:
+    """
+        Wraps a task so that it is cancelled with a
+        TaskTimeoutError once `timeout` seconds have
+        elapsed. Cancellation relies on SIGALRM, so it
+        only applies when running on a main thread.
+    """
+    _func: Callable[..., Result]
+    _timeout: float
+    _token: int | None
+
+    def __init__(
+        self,
+        func: Callable[..., Result],
+        timeout: float,
+        token: int | None = None,
+    ) -> None:
+        self._func = func
+        self._timeout = timeout
+        self._token = token
+
+    def __call__(self) -> Result:
+        if _STARTED is not None and self._token is not None:
+            _STARTED.put((self._token, os.getpid()))
+
+        if threading.current_thread() is not threading.main_thread():
+            return self._func()
+
+        previous = signal.signal(signal.SIGALRM, self._expire)
+        signal.setitimer(signal.ITIMER_REAL, self._timeout)
+        try:
+            return self._func()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    def _expire(self, *_: Any) -> None:
+        raise TaskTimeoutError(
+            f"Task exceeded its timeout of {self._timeout}s"
+        )
+
+
 class Executor(ABC):
 
     @abstractmethod
     def submit(
-        self, 
-        func: Callable, 
-    ) -> None: ...
-        
+        self,
+        func: Callable,
+        timeout: float | None = None,
+        fallback: Callable[[Exception], Result] | None = None,
+        serializer: Serializer | None = None,
+    ) -> None:
+        """
+            Submits `func` for execution. If `timeout` is
+            given, the task is cancelled after that many
+            seconds and `fallback` is used to build its
+            result from the TaskTimeoutError. Executors
+            that ship tasks to other processes serialize
+            them with `serializer` when given, and with
+            their own default otherwise.
+        """
+
     @abstractmethod
     def poll(self) -> list[Result]: ...
 
@@ -38,17 +119,25 @@ class TestExecutor(Executor):
     def submit(
         self,
         func: Callable[..., Result],
+        timeout: float | None = None,
+        fallback: Callable[[Exception], Result] | None = None,
+        serializer: Serializer | None = None,
     ) -> None:
-        res = func()
+        if timeout is not None:
+            func = _Deadline(func, timeout)
+        try:
+            res = func()
+        except Exception as e:
+            if fallback is None:
+                raise
+            res = fallback(e)
         if res is not None:
             self.executed.append(res.id)
         self._results.append(res)
 
     def poll(self) -> list[Result]:
-        return [
-            self._results.pop(i) 
-            for i in range(len(self._results))
-        ]
+        finished, self._results = self._results, []
+        return finished
 
 class SequentialExecutor(Executor):
     _results: list[Result]
@@ -59,36 +148,189 @@ class SequentialExecutor(Executor):
     def submit(
         self,
         func: Callable[..., Result],
+        timeout: float | None = None,
+        fallback: Callable[[Exception], Result] | None = None,
+        serializer: Serializer | None = None,
     ) -> None:
-        self._results.append(func())
+        if timeout is not None:
+            func = _Deadline(func, timeout)
+        try:
+            self._results.append(func())
+        except Exception as e:
+            if fallback is None:
+                raise
+            self._results.append(fallback(e))
 
     def poll(self) -> list[Result]:
-        return [
-            self._results.pop(i) 
-            for i in range(len(self._results))
-        ]
+        finished, self._results = self._results, []
+        return finished
+
+
+@dataclass
+class _Pending:
+    future: _PathosFuture[Result]
+    token: int
+    timeout: float | None = None
+    fallback: Callable[[Exception], Result] | None = None
+    pid: int | None = None
+    started: float | None = None
+
+    def expired(self, now: float, grace: float) -> bool:
+        return (
+            self.timeout is not None
+            and self.started is not None
+            and now - self.started > self.timeout + grace
+        )
+
 
 class PathosExecutor(Executor):
+    """
+        Runs tasks on a pathos ProcessPool.
+
+        Tasks submitted with a timeout are first cancelled
+        inside the worker. If a task ignores the cancellation
+        for longer than `kill_grace` seconds, its worker is
+        killed and the pool spawns a replacement.
+
+        Tasks and their results are serialized with
+        `serializer` before pathos sees them, so pathos
+        only moves bytes. Totals are kept in `stats`.
+    """
     _pool: ProcessPool
-    _futures: list[_PathosFuture[Result]]
+    _futures: list[_Pending]
+    _started: SimpleQueue
+    _grace: float
+    _tokens: count
+    _serializer: Serializer
+    _failed: list[Result]
+    stats: SerializationStats
 
-    def __init__(self, workers=4) -> None:
-        self._pool = ProcessPool(workers=workers)
+    def __init__(
+        self,
+        workers: int = 4,
+        kill_grace: float = 1.0,
+        serializer: Serializer | None = None,
+    ) -> None:
+        self._started = multiprocess.SimpleQueue()
+        self._pool = ProcessPool(
+            nodes=workers,
+            id=uuid4().hex,
+            initializer=_register_worker,
+            initargs=(self._started,),
+        )
         self._futures = []
-    
+        self._grace = kill_grace
+        self._tokens = count()
+        self._serializer = serializer if serializer is not None else DEFAULT_SERIALIZER
+        self._failed = []
+        self.stats = SerializationStats()
+
     def submit(
-        self, 
+        self,
         func: Callable[..., Result],
+        timeout: float | None = None,
+        fallback: Callable[[Exception], Result] | None = None,
+        serializer: Serializer | None = None,
     ) -> None:
-        self._futures.append(self._pool.apipe(func))
+        token = next(self._tokens)
+        if timeout is not None:
+            func = _Deadline(func, timeout, token)
+        try:
+            payload = _Payload.dump(
+                serializer if serializer is not None else self._serializer,
+                func,
+                self.stats,
+            )
+        except Exception as e:
+            if fallback is None:
+                raise
+            self._failed.append(fallback(e))
+            return
+        self._futures.append(
+            _Pending(
+                future=self._pool.apipe(_run_payload, payload),
+                token=token,
+                timeout=timeout,
+                fallback=fallback,
+            )
+        )
 
     def poll(self) -> list[Result]:
-        finished = []
-        for idx, res in enumerate(self._futures):
-            if res.ready():
-                finished.append(self._futures.pop(idx))
+        self._drain_started()
+        now = time.monotonic()
+
+        # Tasks that couldn't be serialized
+        finished, self._failed = self._failed, []
+        pending = []
+        for p in self._futures:
+            if p.future.ready():
+                finished.append(self._collect(p))
+            elif p.expired(now, self._grace):
+                self._recycle(p)
+                if p.fallback is not None:
+                    finished.append(p.fallback(
+                        TaskTimeoutError(
+                            f"Task exceeded its timeout of {p.timeout}s "
+                            "and its worker was killed"
+                        )
+                    ))
+            else:
+                pending.append(p)
+
+        self._futures = pending
         return finished
-    
+
     def empty(self) -> bool:
-        return len(self._futures) == 0
+        return len(self._futures) == 0 and len(self._failed) == 0
+
+    def close(self) -> None:
+        """
+            Shuts down the pool. Terminates rather than
+            closes, since tasks lost to killed workers
+            would otherwise keep the pool from joining.
+        """
+        self._pool.terminate()
+        self._pool.join()
+        self._pool.clear()
+
+    def _collect(self, pending: _Pending) -> Result:
+        try:
+            return pending.future.get().load(self.stats)
+        except Exception as e:
+            if pending.fallback is None:
+                raise
+            return pending.fallback(e)
+
+    def _drain_started(self) -> None:
+        """
+            Records the worker pid and start time of
+            timed tasks that have been picked up.
+        """
+        started = {}
+        while not self._started.empty():
+            token, pid = self._started.get()
+            started[token] = pid
+
+        if not started:
+            return
+
+        now = time.monotonic()
+        for p in self._futures:
+            if p.token in started:
+                p.pid = started[p.token]
+                p.started = now
 
+    def _recycle(self, pending: _Pending) -> None:
+        """
+            Kills the worker stuck on `pending`. The pool
+            notices the dead process and replaces it.
+        """
+        if pending.pid is None:
+            return
+        logging.warning(
+            f"Killing worker {pending.pid} after task timeout"
+        )
+        try:
+            os.kill(pending.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
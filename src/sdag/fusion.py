@@ -0,0 +1,39 @@
+from sdag.node import Task, _Group
+from sdag.resources import Resources, _peak
+from sdag.result import GroupResult, Result
+from sdag.state import TaskState
+
+
+class _Chain(_Group):
+    """
+        A linear chain of tasks fused into one executor
+        submission. Members run one after another in the
+        same worker, each fed its parent's result, and
+        every member's result is reported separately.
+
+        The chain stops at the first member whose policy
+        isn't met; the DAG then settles the remaining
+        members as usual.
+    """
+    __slots__ = ()
+    _members: list[Task]
+
+    @property
+    def resources(self) -> Resources:
+        return _peak([m.resources for m in self._members])
+
+    def run(self) -> GroupResult:
+        results: list[Result] = []
+        for m in self._members:
+            if results:
+                parent = results[-1]
+                state = (
+                    TaskState.SUCCESS if parent.error is None
+                    else TaskState.FAILED
+                )
+                if not m.policy([state]):
+                    break
+                m.input = parent
+            results.append(m.run())
+
+        return GroupResult(id=self.id, results=results)
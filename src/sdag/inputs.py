@@ -0,0 +1,67 @@
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any, Iterator
+from sdag.result import TaskResult
+from sdag.exceptions import InputConflictError
+
+
+class Conflict(Enum):
+    """How a task resolves a key supplied by more than one upstream task.
+
+    Upstream tasks are ordered as they were added to the DAG.
+
+    Attributes
+    ----------
+
+    FIRST: str
+        Use the value from the first upstream task.
+    LAST: str
+        Use the value from the last upstream task.
+    ERROR: str
+        Fail the task.
+    """
+
+    FIRST = "first"
+    LAST = "last"
+    ERROR = "error"
+
+
+class InputView(Mapping[str, Any]):
+    """
+        Read-only view merging the values of several
+        upstream results. Nothing is copied; each key
+        is resolved against the results when looked up.
+    """
+    __slots__ = ("_results", "_conflict")
+    _results: list[TaskResult]
+    _conflict: Conflict
+
+    def __init__(self, results: list[TaskResult], conflict: Conflict) -> None:
+        self._results = results
+        self._conflict = conflict
+
+    def __getitem__(self, key: str) -> Any:
+        results = (
+            reversed(self._results) if self._conflict == Conflict.LAST
+            else self._results
+        )
+        found = [r for r in results if key in r.value]
+        if not found:
+            raise KeyError(key)
+        if len(found) > 1 and self._conflict == Conflict.ERROR:
+            raise InputConflictError(
+                f"Input '{key}' is supplied by more than one upstream task"
+            )
+        return found[0].value[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(dict.fromkeys(k for r in self._results for k in r.value))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        return any(key in r.value for r in self._results)
+
+    def __repr__(self) -> str:
+        return f"InputView({dict(self)})"
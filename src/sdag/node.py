@@ -1,15 +1,27 @@
 from __future__ import annotations
-from typing import Generic, TypeVar, Callable, Any, Self
+from typing import Generic, TypeVar, Callable, Any, Self, Iterator
 from uuid import UUID, uuid4
 from numba.typed import List, Dict
 from numba import njit
 from numba import types
 from sdag.state import TaskState, POLICIES, RunPolicy
-from sdag.result import TaskResult, BranchResult, Result
-from sdag.exceptions import TaskAttributeAccessError, DAGBuildError
+from sdag.result import TaskResult, BranchResult, GroupResult, Result
+from sdag.inputs import InputView, Conflict
+from sdag.exceptions import (
+    TaskAttributeAccessError,
+    DAGBuildError,
+    InputConflictError,
+    TaskTimeoutError,
+)
+from sdag.retry import RetryPolicy, NO_RETRY
+from sdag.resources import Resources, _total
+from sdag.serialization import Serializer
+from sdag.spill import _Spilled
+from pathlib import Path
 from abc import abstractmethod
 import inspect
 import logging
+import time
 
 logging.basicConfig(filename="t.log", level=logging.INFO)
 
@@ -18,26 +30,60 @@ T = TypeVar("T", bound=Callable[..., Any])
 U = TypeVar("U", bound=Result)
 JITInputValue = types.UnionType([types.float64, types.int64, types.unicode_type])
 
+# Parameter through which a streaming task receives
+# the chunks of the streaming task upstream of it.
+STREAM_PARAM = "stream"
+
 
 class _Node(Generic[T, U]):
+    """
+        Base for anything that can be placed in a DAG.
+
+        Nodes are slotted and only keep their direct
+        upstream tasks in `deps`, so large DAGs stay
+        cheap to hold in memory. Ancestors can be
+        derived from the DAG when needed.
+    """
+    __slots__ = (
+        "name",
+        "id",
+        "_exe",
+        "_jit_exe",
+        "_suc",
+        "_err",
+        "_sig",
+        "_state",
+        "_deps",
+        "_policy",
+        "_placed",
+        "_output",
+        "_inputs",
+        "_conflict",
+        "_timeout",
+        "_retry",
+        "_resources",
+        "_serializer",
+        "_retain",
+    )
     name: str
     id: UUID
     _exe: T
-    _jit_exe: Callable[..., Any] | None = None
+    _jit_exe: Callable[..., Any] | None
     _suc: Callable[..., None] | None
     _err: Callable[..., None] | None
     _sig: list[str]
-    _pol: Callable[[list[TaskState]], bool]
     _state: TaskState
-    _deps: list[UUID] = []
-    _upstream: list[UUID] = []
+    _deps: list[UUID]
     _policy: Callable[[list[TaskState]], bool]
-    _placed: bool = False
-    _processed: bool = False
-    _exception: Exception | None = None
-    _input_history: list[dict[str, Any]] | List[Dict[str, Any]] = []
-    _output: U | None = None
-    _input: TaskResult
+    _placed: bool
+    _output: U | _Spilled | None
+    _inputs: dict[UUID, TaskResult]
+    _conflict: Conflict
+    _timeout: float | None
+    _retry: RetryPolicy
+    _resources: Resources
+    _serializer: Serializer | None
+    _retain: bool
     
     def __init__(
         self,
@@ -45,14 +91,35 @@ class _Node(Generic[T, U]):
         on_execute: T,
         on_success: Callable[..., None] | None = None,
         on_error: Callable[..., None] | None = None,
+        policy: RunPolicy = RunPolicy.ALL_SUCCESS,
+        timeout: float | None = None,
+        retry: RetryPolicy | None = None,
+        resources: Resources | None = None,
+        conflict: Conflict = Conflict.LAST,
+        serializer: Serializer | None = None,
+        retain: bool = False,
     ) -> None:
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Timeout must be a positive number of seconds")
+
         self._exe = on_execute
+        self._jit_exe = None
         self._suc = on_success
         self._err = on_error
         self.name = name
         self.id = uuid4()
         self._state = TaskState.BUILDING
-        self._policy = POLICIES[RunPolicy.ALL_SUCCESS]
+        self._policy = POLICIES[policy]
+        self._timeout = timeout
+        self._retry = retry if retry is not None else NO_RETRY
+        self._resources = resources if resources is not None else Resources()
+        self._deps = []
+        self._placed = False
+        self._output = None
+        self._inputs = {}
+        self._conflict = conflict
+        self._serializer = serializer
+        self._retain = retain
         
         sig = inspect.signature(self._exe)
         self._sig = list(sig.parameters.keys())
@@ -61,10 +128,46 @@ class _Node(Generic[T, U]):
     def run(self) -> U: ...
 
     @abstractmethod
-    def on_success(self) -> None: ...
+    def fail(self, error: Exception, attempts: int = 1) -> U:
+        """
+            Builds a failed result for this node when
+            the executor could not obtain one from `run`,
+            e.g. after a timeout.
+        """
 
-    @abstractmethod
-    def on_error(self) -> None: ...
+    def _execute(self) -> tuple[Any, Exception | None, int]:
+        """
+            Calls `on_execute` with the node's inputs,
+            retrying failed attempts in place according
+            to its RetryPolicy. Returns the value, the
+            final error and the number of attempts.
+        """
+        try:
+            kwargs = self._input_value
+        except InputConflictError as e:
+            return None, e, 1
+
+        attempt = 1
+        while True:
+            try:
+                return self._exe(**kwargs), None, attempt
+            except Exception as e:
+                if not self._retry.should_retry(e, attempt):
+                    return None, e, attempt
+            try:
+                time.sleep(self._retry.delay(attempt))
+            except TaskTimeoutError as e:
+                # The deadline fell during the backoff
+                return None, e, attempt
+            attempt += 1
+
+    def on_success(self, result: U | None = None) -> None:
+        if self._suc is not None:
+            _call_callback(self._suc, result if result is not None else self.output)
+
+    def on_error(self, result: U | None = None) -> None:
+        if self._err is not None:
+            _call_callback(self._err, result if result is not None else self.output)
 
     @property
     def has_success_callback(self) -> bool:
@@ -74,6 +177,28 @@ class _Node(Generic[T, U]):
     def has_error_callback(self) -> bool:
         return self._err is not None
 
+    @property
+    def timeout(self) -> float | None:
+        return self._timeout
+
+    @property
+    def retry(self) -> RetryPolicy:
+        return self._retry
+
+    @property
+    def resources(self) -> Resources:
+        return self._resources
+
+    @property
+    def serializer(self) -> Serializer | None:
+        """Overrides the DAG's serializer for this node."""
+        return self._serializer
+
+    @property
+    def retain(self) -> bool:
+        """Keeps the output when the DAG releases outputs."""
+        return self._retain
+
     @property
     def state(self) -> TaskState:
         return self._state
@@ -86,6 +211,7 @@ class _Node(Generic[T, U]):
 
     @property
     def deps(self) -> list[UUID]:
+        """Direct upstream tasks."""
         return self._deps
 
     @deps.setter
@@ -94,13 +220,15 @@ class _Node(Generic[T, U]):
 
     @property
     def upstream(self) -> list[UUID]:
-        return self._upstream
+        return self._deps
 
     def add_upstream(self, task: UUID) -> None:
-        self._upstream.append(task)
+        self._deps.append(task)
 
     @property
     def output(self) -> U | None:
+        if isinstance(self._output, _Spilled):
+            return self._output.load()
         return self._output 
     
     @output.setter
@@ -108,16 +236,92 @@ class _Node(Generic[T, U]):
         self._output = output
 
     @property
-    def input(self) -> TaskResult:
-        return self._input
+    def spilled(self) -> bool:
+        return isinstance(self._output, _Spilled)
+
+    def release_output(self, path: Path | None = None) -> None:
+        """
+            Drops the output once nothing downstream
+            needs it, writing it to `path` first if given
+            so `output` can still load it.
+        """
+        if self._output is None or self.spilled:
+            return
+        if path is not None:
+            self._output = _Spilled.dump(self._output, path)
+        else:
+            self._output = None
+
+    @property
+    def input(self) -> InputView:
+        """
+            Merged view of the upstream results, ordered
+            as the upstream tasks were added to the DAG.
+        """
+        order = {d: i for i, d in enumerate(self._deps)}
+        results = sorted(
+            self._inputs.values(),
+            key=lambda r: order.get(r.id, len(order)),
+        )
+        return InputView(results, self._conflict)
     
     @input.setter
     def input(self, input: TaskResult) -> None:
-        self._input_value = {
-            k: v for k, v in input.value.items()
-            if k in self._sig
-        }
-        self._input = input
+        self._inputs = {input.id: input}
+
+    def add_input(self, input: TaskResult) -> None:
+        """Adds the result of one upstream task."""
+        self._inputs[input.id] = input
+
+    def inherit_input(self, node: _Node) -> None:
+        """Takes on another node's inputs, e.g. a branch's."""
+        self._inputs = dict(node._inputs)
+
+    def clear_input(self) -> None:
+        self._inputs = {}
+
+    @property
+    def _input_value(self) -> dict[str, Any]:
+        """
+            Materializes only the inputs named in the
+            signature of `on_execute`.
+        """
+        view = self.input
+        return {k: view[k] for k in self._sig if k in view}
+
+    def __getstate__(self) -> tuple[None, dict[str, Any]]:
+        """
+            Ships only the inputs `on_execute` takes,
+            rather than every upstream value. Callbacks
+            only run on the coordinator, so they're left
+            behind.
+        """
+        _, state = super().__getstate__()
+        state = dict(state)
+        state["_suc"] = state["_err"] = None
+        try:
+            state["_inputs"] = {
+                self.id: TaskResult(id=self.id, value=self._input_value)
+            }
+        except InputConflictError:
+            # Left for `run` to report
+            pass
+        return None, state
+
+    def _copy(self) -> Self:
+        """
+            Copies the node for another run of the same
+            DAG, keeping its id but not its inputs or
+            output.
+        """
+        node = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            for slot in cls.__dict__.get("__slots__", ()):
+                if hasattr(self, slot):
+                    setattr(node, slot, getattr(self, slot))
+        node._inputs = {}
+        node._output = None
+        return node
 
     def policy(self, states: list[TaskState]) -> bool:
         return self._policy(states)
@@ -132,7 +336,31 @@ class _Node(Generic[T, U]):
     def __repr__(self):
         return self.name
 
+def _call_callback(callback: Callable[..., None], result: Result | None) -> None:
+    """Passes the node's result to callbacks that take an argument."""
+    if inspect.signature(callback).parameters:
+        callback(result)
+    else:
+        callback()
+
+
 class Task(_Node[Callable[..., dict[str, Any]], TaskResult]):
+    """
+        Runs `on_execute` and passes the returned dict
+        downstream.
+
+        If `on_execute` is a generator function, the task
+        streams: each yielded dict is a chunk, and the dict
+        it returns is the task's value. A task that takes
+        a `stream` parameter is fed the chunks of its
+        upstream streaming task as they're produced, through
+        a buffer of `buffer_size` chunks. If it isn't a
+        generator itself, it consumes the stream and returns
+        its dict, ending the pipeline.
+    """
+    __slots__ = ("_streaming", "_buffer_size")
+    _streaming: bool
+    _buffer_size: int
 
     def __init__(
         self,
@@ -140,25 +368,94 @@ class Task(_Node[Callable[..., dict[str, Any]], TaskResult]):
         on_execute: Callable[..., dict[str, Any]],
         on_success: Callable[..., None] | None = None,
         on_error: Callable[..., None] | None = None,
+        policy: RunPolicy = RunPolicy.ALL_SUCCESS,
+        timeout: float | None = None,
+        retry: RetryPolicy | None = None,
+        resources: Resources | None = None,
+        conflict: Conflict = Conflict.LAST,
+        serializer: Serializer | None = None,
+        retain: bool = False,
+        buffer_size: int = 16,
     ) -> None:
         super().__init__(
             name=name,
             on_execute=on_execute,
             on_success=on_success,
             on_error=on_error,
+            policy=policy,
+            timeout=timeout,
+            retry=retry,
+            resources=resources,
+            conflict=conflict,
+            serializer=serializer,
+            retain=retain,
         )
-        self.input = TaskResult(id=self.id)
+        self._streaming = inspect.isgeneratorfunction(on_execute)
+        if (self._streaming or STREAM_PARAM in self._sig) and self._retry.retries:
+            raise ValueError("Streaming tasks cannot be retried")
+        if buffer_size < 1:
+            raise ValueError("Buffer size must be at least 1")
+        self._buffer_size = buffer_size
+
+    @property
+    def streaming(self) -> bool:
+        return self._streaming
+
+    @property
+    def takes_stream(self) -> bool:
+        return STREAM_PARAM in self._sig
+
+    @property
+    def buffer_size(self) -> int:
+        return self._buffer_size
     
     def run(self) -> TaskResult:
+        if self._streaming:
+            return self._stream()
+
+        res, error, attempts = self._execute()
+        if error is not None:
+            return self.fail(error, attempts)
+
+        return TaskResult(id=self.id, value=res, attempts=attempts)
+
+    def fail(self, error: Exception, attempts: int = 1) -> TaskResult:
+        return TaskResult(id=self.id, error=error, attempts=attempts)
+
+    def _stream(
+        self,
+        upstream: Iterator[dict[str, Any]] | None = None,
+        emit: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> TaskResult:
+        """
+            Drives a streaming task, handing each chunk
+            to `emit`. Stops early once `emit` returns
+            False, i.e. the consumer is done. A consumer
+            that isn't a generator just returns its dict.
+        """
         try:
-            res = self._exe(**self._input_value)
-        except Exception as e:
-            return TaskResult(id=self.id, error=e)
+            kwargs = self._input_value
+            if upstream is not None:
+                kwargs = {**kwargs, STREAM_PARAM: upstream}
+
+            if not self._streaming:
+                return TaskResult(id=self.id, value=self._exe(**kwargs))
 
-        return TaskResult(id=self.id, value=res)
+            chunks = self._exe(**kwargs)
+            while True:
+                chunk = next(chunks)
+                if emit is not None and not emit(chunk):
+                    chunks.close()
+                    return TaskResult(id=self.id)
+        except StopIteration as stop:
+            value = stop.value if stop.value is not None else {}
+            return TaskResult(id=self.id, value=value)
+        except Exception as e:
+            return self.fail(e)
     
 
 class Branch(_Node[Callable[..., str], BranchResult]): 
+    __slots__ = ("_error_branch",)
     _error_branch: str | None
 
     def __init__(
@@ -168,6 +465,13 @@ class Branch(_Node[Callable[..., str], BranchResult]):
         on_success: Callable[..., None] | None = None,
         on_error: Callable[..., None] | None = None,
         error_branch: str | None = None,
+        policy: RunPolicy = RunPolicy.ALL_SUCCESS,
+        timeout: float | None = None,
+        retry: RetryPolicy | None = None,
+        resources: Resources | None = None,
+        conflict: Conflict = Conflict.LAST,
+        serializer: Serializer | None = None,
+        retain: bool = False,
     ) -> None:
         self._error_branch = error_branch
         super().__init__(
@@ -175,13 +479,72 @@ class Branch(_Node[Callable[..., str], BranchResult]):
             on_execute=on_execute,
             on_success=on_success,
             on_error=on_error,
+            policy=policy,
+            timeout=timeout,
+            retry=retry,
+            resources=resources,
+            conflict=conflict,
+            serializer=serializer,
+            retain=retain,
         )
    
     def run(self) -> BranchResult:
-        try:
-            res = self._exe(**self._input_value)
-        except Exception as e:
-            return BranchResult(id=self.id, error=e, value=self._error_branch)
+        res, error, attempts = self._execute()
+        if error is not None:
+            return self.fail(error, attempts)
+
+        return BranchResult(id=self.id, value=res, attempts=attempts)
 
-        return BranchResult(id=self.id, value=res)
+    def fail(self, error: Exception, attempts: int = 1) -> BranchResult:
+        return BranchResult(
+            id=self.id,
+            error=error,
+            value=self._error_branch,
+            attempts=attempts,
+        )
+
+
+
+class _Group:
+    """
+        Several nodes submitted to the executor as one
+        unit. `run` returns a GroupResult with the result
+        of every member that ran.
+    """
+    __slots__ = ("id", "_members")
+    id: UUID
+    _members: list[_Node]
 
+    def __init__(self, members: list[_Node]) -> None:
+        self.id = members[0].id
+        self._members = members
+
+    @property
+    def ids(self) -> list[UUID]:
+        return [m.id for m in self._members]
+
+    @property
+    def timeout(self) -> float | None:
+        """Members run concurrently unless a subclass says otherwise."""
+        timeouts = [m.timeout for m in self._members]
+        if any(t is None for t in timeouts):
+            return None
+        return max(timeouts)
+
+    @property
+    def resources(self) -> Resources:
+        """Members run concurrently unless a subclass says otherwise."""
+        return _total([m.resources for m in self._members])
+
+    @property
+    def serializer(self) -> Serializer | None:
+        return self._members[0].serializer
+
+    @abstractmethod
+    def run(self) -> GroupResult: ...
+
+    def fail(self, error: Exception, attempts: int = 1) -> GroupResult:
+        return GroupResult(
+            id=self.id,
+            results=[m.fail(error, attempts) for m in self._members],
+        )
@@ -0,0 +1,151 @@
+from dataclasses import dataclass, field
+from sdag.exceptions import DAGBuildError
+from typing import Hashable
+
+
+@dataclass(frozen=True)
+class Resources:
+    """Resources a task holds while it is running.
+
+    Attributes
+    ----------
+
+    cpu: int
+        Number of cpu slots.
+    memory_mb: int
+        Estimated peak memory in megabytes.
+    pools: dict[str, int]
+        Slots taken in named concurrency pools,
+        e.g. {"db": 1}.
+    """
+
+    cpu: int = 1
+    memory_mb: int = 0
+    pools: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.cpu < 0 or self.memory_mb < 0:
+            raise ValueError("Resource requirements cannot be negative")
+        if any(v < 0 for v in self.pools.values()):
+            raise ValueError("Pool slots cannot be negative")
+
+
+def _total(resources: list[Resources]) -> Resources:
+    """Resources needed to run tasks concurrently."""
+    pools: dict[str, int] = {}
+    for r in resources:
+        for pool, slots in r.pools.items():
+            pools[pool] = pools.get(pool, 0) + slots
+    return Resources(
+        cpu=sum(r.cpu for r in resources),
+        memory_mb=sum(r.memory_mb for r in resources),
+        pools=pools,
+    )
+
+
+def _peak(resources: list[Resources]) -> Resources:
+    """Resources needed to run tasks one after another."""
+    pools: dict[str, int] = {}
+    for r in resources:
+        for pool, slots in r.pools.items():
+            pools[pool] = max(pools.get(pool, 0), slots)
+    return Resources(
+        cpu=max(r.cpu for r in resources),
+        memory_mb=max(r.memory_mb for r in resources),
+        pools=pools,
+    )
+
+
+@dataclass(frozen=True)
+class Capacity:
+    """Resources available to a DAG run.
+
+    Limits left as None are unbounded, as are
+    pools that aren't listed.
+
+    Attributes
+    ----------
+
+    cpu: int | None
+        Total cpu slots.
+    memory_mb: int | None
+        Total memory budget in megabytes.
+    pools: dict[str, int]
+        Size of each named concurrency pool,
+        e.g. {"db": 4}.
+    """
+
+    cpu: int | None = None
+    memory_mb: int | None = None
+    pools: dict[str, int] = field(default_factory=dict)
+
+
+class _Admission:
+    """
+        Tracks resources held by running tasks and
+        only admits a task while it fits in what's left.
+    """
+    _capacity: Capacity
+    _cpu: int
+    _memory_mb: int
+    _pools: dict[str, int]
+    _held: dict[Hashable, Resources]
+
+    def __init__(self, capacity: Capacity) -> None:
+        self._capacity = capacity
+        self._cpu = 0
+        self._memory_mb = 0
+        self._pools = {}
+        self._held = {}
+
+    def check(self, name: str, resources: Resources) -> None:
+        """
+            Raises if a task could never be admitted,
+            as it would otherwise wait forever.
+        """
+        if not self._fits(resources, 0, 0, {}):
+            raise DAGBuildError(
+                f"Task {name} requires more resources than the DAG's capacity"
+            )
+
+    def try_acquire(self, task: Hashable, resources: Resources) -> bool:
+        if not self._fits(resources, self._cpu, self._memory_mb, self._pools):
+            return False
+
+        self._cpu += resources.cpu
+        self._memory_mb += resources.memory_mb
+        for pool, slots in resources.pools.items():
+            self._pools[pool] = self._pools.get(pool, 0) + slots
+        self._held[task] = resources
+        return True
+
+    def release(self, task: Hashable) -> None:
+        resources = self._held.pop(task, None)
+        if resources is None:
+            return
+
+        self._cpu -= resources.cpu
+        self._memory_mb -= resources.memory_mb
+        for pool, slots in resources.pools.items():
+            self._pools[pool] -= slots
+
+    def _fits(
+        self,
+        resources: Resources,
+        cpu: int,
+        memory_mb: int,
+        pools: dict[str, int],
+    ) -> bool:
+        capacity = self._capacity
+        if capacity.cpu is not None and cpu + resources.cpu > capacity.cpu:
+            return False
+        if (
+            capacity.memory_mb is not None
+            and memory_mb + resources.memory_mb > capacity.memory_mb
+        ):
+            return False
+        return all(
+            pools.get(pool, 0) + slots <= capacity.pools[pool]
+            for pool, slots in resources.pools.items()
+            if pool in capacity.pools
+        )
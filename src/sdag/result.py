@@ -1,11 +1,13 @@
 from dataclasses import dataclass, field
 from typing import Any
 from uuid import UUID
+from sdag.state import TaskState
 
 @dataclass
 class Result:
     id: UUID
     error: Exception | None = None
+    attempts: int = 1
 
     def __repr__(self) -> str:
         return (
@@ -32,3 +34,43 @@ class BranchResult(Result):
             f"Next task: {self.value}"
         )
 
+
+@dataclass
+class GroupResult(Result):
+    results: list[Result] = field(default_factory=list)
+
+    def __repr__(self) -> str:
+        return (
+            f"Group ID: {self.id}\n"
+            f"Results: {self.results}"
+        )
+
+
+@dataclass
+class RunResult:
+    """Outcome of one run of a DAG in `DAG.run_many`.
+
+    Attributes
+    ----------
+
+    index: int
+        Position of the run's input in the inputs.
+    input: dict[str, Any]
+        Values the root tasks were run with.
+    states: dict[UUID, TaskState]
+        Final state of every task, by task id.
+    outputs: dict[UUID, Result]
+        Result of every task that ran and still holds
+        it, by task id. With `release_outputs`, that is
+        only sinks and retained tasks: released and
+        spilled outputs are left out.
+    """
+
+    index: int
+    input: dict[str, Any]
+    states: dict[UUID, TaskState] = field(default_factory=dict)
+    outputs: dict[UUID, Result] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> bool:
+        return any(s == TaskState.FAILED for s in self.states.values())
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from sdag.exceptions import TaskTimeoutError
+import random
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry settings for a task.
+
+    Retries happen inside `run`, in whichever process
+    is executing the task, so a retry never goes back
+    through the DAG or the executor.
+
+    Attributes
+    ----------
+
+    retries: int
+        Number of retries after the first attempt.
+    backoff: float
+        Seconds to wait before the first retry.
+    multiplier: float
+        Factor applied to the wait after each retry.
+    max_backoff: float | None
+        Upper bound on the wait between attempts.
+    jitter: float
+        Fraction of the wait to randomize, between 0 and 1.
+    retry_on: tuple[type[Exception], ...]
+        Exception types that trigger a retry. Timeouts
+        are never retried.
+    """
+
+    retries: int = 0
+    backoff: float = 0.0
+    multiplier: float = 2.0
+    max_backoff: float | None = None
+    jitter: float = 0.0
+    retry_on: tuple[type[Exception], ...] = (Exception,)
+
+    def __post_init__(self) -> None:
+        if self.retries < 0:
+            raise ValueError("Retries cannot be negative")
+        if self.backoff < 0 or self.multiplier < 1:
+            raise ValueError(
+                "Backoff cannot be negative and multiplier must be at least 1"
+            )
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("Jitter must be between 0 and 1")
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        return (
+            attempt <= self.retries
+            and isinstance(error, self.retry_on)
+            and not isinstance(error, TaskTimeoutError)
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given failed attempt."""
+        delay = self.backoff * self.multiplier ** (attempt - 1)
+        if self.max_backoff is not None:
+            delay = min(delay, self.max_backoff)
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return delay
+
+
+NO_RETRY = RetryPolicy()
@@ -0,0 +1,102 @@
+from sdag.executors import Executor
+from sdag.result import Result
+from sdag.serialization import Serializer
+from dataclasses import dataclass
+from typing import Callable, Any
+
+
+@dataclass
+class _Tagged(Result):
+    """A result labelled with the run it belongs to."""
+    run: int = 0
+    result: Result | None = None
+
+
+@dataclass
+class _Tag:
+    """Wraps a submission so its result comes back tagged."""
+    run: int
+    func: Callable[[], Result]
+
+    def __call__(self) -> _Tagged:
+        res = self.func()
+        return _Tagged(id=res.id, run=self.run, result=res)
+
+
+@dataclass
+class _TagFallback:
+    run: int
+    fallback: Callable[[Exception], Result]
+
+    def __call__(self, error: Exception) -> _Tagged:
+        res = self.fallback(error)
+        return _Tagged(id=res.id, run=self.run, result=res)
+
+
+class _Multiplexer:
+    """
+        Shares one executor between concurrent runs of
+        a DAG. Results are polled once per scheduling
+        pass and sorted into an inbox per run.
+    """
+    _executor: Executor
+    _inbox: dict[int, list[Result]]
+    _in_flight: int
+
+    def __init__(self, executor: Executor) -> None:
+        self._executor = executor
+        self._inbox = {}
+        self._in_flight = 0
+
+    def submit(self, run: int, func: Callable[..., Result], **kwargs: Any) -> None:
+        self._executor.submit(_Tag(run, func), **kwargs)
+        self._in_flight += 1
+
+    def poll(self) -> None:
+        for res in self._executor.poll():
+            self._in_flight -= 1
+            self._inbox.setdefault(res.run, []).append(res.result)
+
+    def drain(self) -> None:
+        """
+            Waits for everything submitted to come back,
+            so no tagged result is left for whoever polls
+            the executor next.
+        """
+        while self._in_flight:
+            self.poll()
+        self._inbox = {}
+
+    def take(self, run: int) -> list[Result]:
+        return self._inbox.pop(run, [])
+
+
+class _RunExecutor(Executor):
+    """The view of a _Multiplexer seen by a single run."""
+    _mux: _Multiplexer
+    _run: int
+
+    def __init__(self, mux: _Multiplexer, run: int) -> None:
+        self._mux = mux
+        self._run = run
+
+    def submit(
+        self,
+        func: Callable[..., Result],
+        timeout: float | None = None,
+        fallback: Callable[[Exception], Result] | None = None,
+        serializer: Serializer | None = None,
+    ) -> None:
+        self._mux.submit(
+            self._run,
+            func,
+            timeout=timeout,
+            fallback=(
+                _TagFallback(self._run, fallback)
+                if fallback is not None else None
+            ),
+            serializer=serializer,
+        )
+
+    def poll(self) -> list[Result]:
+        return self._mux.take(self._run)
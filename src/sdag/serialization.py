@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Sequence
+import pickle
+import time
+import dill
+
+Buffer = bytes | bytearray | memoryview
+
+
+class Serializer(ABC):
+    """
+        Turns what executors ship to their workers into
+        bytes. `dumps` returns the pickle stream and the
+        out-of-band buffers it refers to, which `loads`
+        needs back in the same order. Serializers are
+        sent along with each task, so keep them small
+        and stateless.
+    """
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> tuple[bytes, list[memoryview]]: ...
+
+    @abstractmethod
+    def loads(self, data: Buffer, buffers: Sequence[Buffer] = ()) -> Any: ...
+
+
+class PickleSerializer(Serializer):
+    """
+        Standard library pickle with protocol 5, so large
+        buffers such as NumPy arrays and Arrow columns are
+        kept out of band instead of being copied into the
+        stream. Cannot serialize lambdas or closures.
+    """
+
+    def dumps(self, obj: Any) -> tuple[bytes, list[memoryview]]:
+        buffers: list[pickle.PickleBuffer] = []
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        return data, [b.raw() for b in buffers]
+
+    def loads(self, data: Buffer, buffers: Sequence[Buffer] = ()) -> Any:
+        return pickle.loads(data, buffers=buffers)
+
+
+class CloudpickleSerializer(PickleSerializer):
+    """
+        cloudpickle with protocol 5. Serializes lambdas
+        and closures by value while keeping large buffers
+        out of band. Requires the `cloudpickle` package.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import cloudpickle  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "CloudpickleSerializer requires cloudpickle, "
+                "install it with `pip install cloudpickle`"
+            ) from e
+
+    def dumps(self, obj: Any) -> tuple[bytes, list[memoryview]]:
+        import cloudpickle
+
+        buffers: list[pickle.PickleBuffer] = []
+        data = cloudpickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        return data, [b.raw() for b in buffers]
+
+
+class DillSerializer(Serializer):
+    """
+        dill, which handles nearly anything but copies
+        every buffer into the stream. The default.
+    """
+
+    def dumps(self, obj: Any) -> tuple[bytes, list[memoryview]]:
+        return dill.dumps(obj), []
+
+    def loads(self, data: Buffer, buffers: Sequence[Buffer] = ()) -> Any:
+        return dill.loads(data)
+
+
+DEFAULT_SERIALIZER = DillSerializer()
+
+
+@dataclass
+class SerializationStats:
+    """Totals kept by an executor for what it serialized."""
+    payloads: int = 0
+    bytes_serialized: int = 0
+    out_of_band_bytes: int = 0
+    bytes_deserialized: int = 0
+    seconds: float = 0.0
+
+    def record_dumps(self, data: Buffer, buffers: Sequence[Buffer], seconds: float) -> None:
+        self.payloads += 1
+        self.bytes_serialized += _nbytes(data)
+        self.out_of_band_bytes += sum(_nbytes(b) for b in buffers)
+        self.seconds += seconds
+
+    def record_loads(self, data: Buffer, buffers: Sequence[Buffer], seconds: float) -> None:
+        self.bytes_deserialized += _nbytes(data) + sum(_nbytes(b) for b in buffers)
+        self.seconds += seconds
+
+
+@dataclass
+class _Payload:
+    """A serialized object together with how to load it."""
+    serializer: Serializer
+    data: bytes
+    buffers: list[Buffer] = field(default_factory=list)
+
+    @classmethod
+    def dump(
+        cls,
+        serializer: Serializer,
+        obj: Any,
+        stats: SerializationStats | None = None,
+    ) -> "_Payload":
+        start = time.perf_counter()
+        data, buffers = serializer.dumps(obj)
+        if stats is not None:
+            stats.record_dumps(data, buffers, time.perf_counter() - start)
+        return cls(serializer, data, list(buffers))
+
+    def load(self, stats: SerializationStats | None = None) -> Any:
+        start = time.perf_counter()
+        obj = self.serializer.loads(self.data, self.buffers)
+        if stats is not None:
+            stats.record_loads(self.data, self.buffers, time.perf_counter() - start)
+        return obj
+
+    def __getstate__(self) -> dict[str, Any]:
+        # memoryviews can't be pickled by the transport
+        state = dict(self.__dict__)
+        state["buffers"] = [
+            bytes(b) if isinstance(b, memoryview) else b
+            for b in self.buffers
+        ]
+        return state
+
+
+def _run_payload(payload: _Payload) -> _Payload:
+    """
+        Runs a serialized task in a worker and returns
+        its result serialized the same way.
+    """
+    func: Callable[[], Any] = payload.load()
+    return _Payload.dump(payload.serializer, func())
+
+
+def _nbytes(b: Buffer) -> int:
+    return memoryview(b).nbytes
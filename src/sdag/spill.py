@@ -0,0 +1,20 @@
+from sdag.result import Result
+from dataclasses import dataclass
+from pathlib import Path
+import dill
+
+
+@dataclass(frozen=True)
+class _Spilled:
+    """An output written to disk to free memory."""
+    path: Path
+
+    @classmethod
+    def dump(cls, result: Result, path: Path) -> "_Spilled":
+        with open(path, "wb") as f:
+            dill.dump(result, f)
+        return cls(path)
+
+    def load(self) -> Result:
+        with open(self.path, "rb") as f:
+            return dill.load(f)
@@ -30,6 +30,13 @@ class TaskState(Enum):
     SKIPPED = "skipped"
 
 
+FINISHED_STATES: frozenset[TaskState] = frozenset({
+    TaskState.FAILED,
+    TaskState.SUCCESS,
+    TaskState.SKIPPED,
+})
+
+
 class RunPolicy(Enum):
     """Enum representing the run policy for tasks.
     
@@ -0,0 +1,117 @@
+from sdag.node import Task, _Group
+from sdag.result import Result, GroupResult
+from typing import Any, Iterator
+import threading
+import queue
+
+_END = object()
+_FAILED = object()
+
+
+class _UpstreamFailed(BaseException):
+    """
+        Raised inside a stage when the stage feeding it
+        failed. Derives from BaseException so user code
+        catching Exception doesn't swallow it.
+    """
+
+
+class _Buffer:
+    """Bounded buffer between two pipeline stages."""
+    _queue: queue.Queue
+    _closed: threading.Event
+
+    def __init__(self, size: int) -> None:
+        self._queue = queue.Queue(maxsize=size)
+        self._closed = threading.Event()
+
+    def put(self, chunk: Any) -> bool:
+        """
+            Blocks while the buffer is full. Returns False
+            if the consumer finished and won't read it.
+        """
+        while not self._closed.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def finish(self, failed: bool) -> None:
+        self.put(_FAILED if failed else _END)
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        while True:
+            try:
+                chunk = self._queue.get(timeout=0.05)
+            except queue.Empty:
+                if self._closed.is_set():
+                    # Cancelled, the producer won't finish
+                    raise _UpstreamFailed()
+                continue
+            if chunk is _END:
+                return
+            if chunk is _FAILED:
+                raise _UpstreamFailed()
+            yield chunk
+
+
+class _Pipeline(_Group):
+    """
+        A chain of streaming tasks run concurrently in one
+        worker, each stage on its own thread, connected by
+        bounded buffers so a slow stage holds back the
+        stages feeding it.
+
+        Stages that never ran because an upstream stage
+        failed are left out of the result.
+    """
+    __slots__ = ()
+    _members: list[Task]
+
+    def run(self) -> GroupResult:
+        stages = self._members
+        buffers = [_Buffer(s.buffer_size) for s in stages[1:]]
+        results: list[Result | None] = [None] * len(stages)
+
+        def work(i: int) -> None:
+            upstream = buffers[i - 1] if i > 0 else None
+            downstream = buffers[i] if i < len(buffers) else None
+            res = None
+            try:
+                res = stages[i]._stream(
+                    upstream=iter(upstream) if upstream is not None else None,
+                    emit=downstream.put if downstream is not None else None,
+                )
+            except _UpstreamFailed:
+                pass
+            finally:
+                if upstream is not None:
+                    upstream.close()
+                if downstream is not None:
+                    downstream.finish(res is None or res.error is not None)
+            results[i] = res
+
+        threads = [
+            threading.Thread(target=work, args=(i,), daemon=True)
+            for i in range(len(stages))
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        except Exception as e:
+            # Cancelled, e.g. by a timeout. Unblock the stages.
+            for b in buffers:
+                b.close()
+            return self.fail(e)
+
+        return GroupResult(
+            id=self.id,
+            results=[r for r in results if r is not None],
+        )
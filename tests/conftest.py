@@ -1,7 +1,26 @@
 import pytest
+from typing import Callable
 from sdag.dag import DAG
 from sdag.builder import DAGBuilder
-from sdag.executors import TestExecutor
+from sdag.result import Result
+from sdag.executors import Executor, TestExecutor
+
+
+class DeferredExecutor(Executor):
+    """Runs submitted tasks on the next poll, tracking concurrency."""
+    __test__: bool = False
+
+    def __init__(self) -> None:
+        self._pending: list[Callable[..., Result]] = []
+        self.max_in_flight = 0
+
+    def submit(self, func, timeout=None, fallback=None, serializer=None) -> None:
+        self._pending.append(func)
+        self.max_in_flight = max(self.max_in_flight, len(self._pending))
+
+    def poll(self) -> list[Result]:
+        pending, self._pending = self._pending, []
+        return [func() for func in pending]
 
 
 @pytest.fixture
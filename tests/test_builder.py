@@ -1,5 +1,10 @@
+import pytest
+import networkx as nx
 from sdag.node import Task, Branch
-from sdag.builder import DAGBuilder, join
+from sdag.dag import DAG
+from sdag.builder import DAGBuilder, join, from_edges, from_networkx
+from sdag.executors import TestExecutor
+from sdag.exceptions import DAGBuildError
 
 def get_tasks(num: int) -> tuple[Task, ...]:
     def noop():
@@ -159,3 +164,81 @@ def test_large_dag(builder: DAGBuilder) -> None:
     assert len(dag._tasks) == 12
 
 
+
+def test_deps_are_direct(builder: DAGBuilder) -> None:
+    t1, t2, t3, t4, t5 = get_tasks(5)
+
+    r1 = builder.add_root(t1).add_task(t2)
+    r2 = builder.add_root(t3)
+    join(t4, [r1, r2]).add_task(t5)
+
+    dag = builder.finalize()
+
+    assert t2.deps == [t1.id]
+    assert t4.deps == [t2.id, t3.id]
+    assert t5.deps == [t4.id]
+    assert dag.ancestors(t5.id) == {t1.id, t2.id, t3.id, t4.id}
+
+
+def test_nodes_are_slotted() -> None:
+    t1 = get_tasks(1)[0]
+    b1 = get_branches(1)[0]
+
+    assert not hasattr(t1, "__dict__")
+    assert not hasattr(b1, "__dict__")
+    # No mutable state is shared between instances
+    assert t1.deps is not get_tasks(1)[0].deps
+
+
+def test_from_edges() -> None:
+    t1, t2, t3, t4 = get_tasks(4)
+    branch = get_branches(1)[0]
+
+    dag = from_edges(
+        DAG(executor=TestExecutor()),
+        edges=[(t1, branch), (branch, t2), (branch, t3), (t2, t4), (t3, t4)],
+    )
+
+    assert dag._roots == [t1.id]
+    assert dag._adj[branch.id] == [t2.id, t3.id]
+    assert t4.deps == [t2.id, t3.id]
+    assert all(t.placed for t in (t2, t3, t4))
+
+
+def test_from_edges_rejects_cycles() -> None:
+    t1, t2, t3, t4 = get_tasks(4)
+
+    with pytest.raises(DAGBuildError, match="Task2, Task3, Task4"):
+        from_edges(
+            DAG(executor=TestExecutor()),
+            edges=[(t1, t2), (t2, t3), (t3, t4), (t4, t2)],
+        )
+
+
+def test_from_edges_rejects_unreachable() -> None:
+    t1, t2, t3, t4 = get_tasks(4)
+
+    with pytest.raises(DAGBuildError, match="Task3, Task4"):
+        from_edges(
+            DAG(executor=TestExecutor()),
+            edges=[(t1, t2), (t3, t4)],
+            roots=[t1],
+        )
+
+    t5, t6 = get_tasks(2)
+    with pytest.raises(DAGBuildError, match="upstream"):
+        from_edges(DAG(executor=TestExecutor()), edges=[(t5, t6)], roots=[t6])
+
+
+def test_from_networkx() -> None:
+    graph = nx.DiGraph()
+    for i in range(1000):
+        graph.add_node(i, task=Task(name=f"t{i}", on_execute=lambda: {}))
+    graph.add_edges_from((i, i + 1) for i in range(999))
+
+    dag = from_networkx(DAG(executor=TestExecutor()), graph)
+    dag.run()
+
+    assert len(dag._tasks) == 1000
+    assert len(dag._roots) == 1
+    assert len(dag._executor.executed) == 1000
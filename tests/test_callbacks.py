@@ -0,0 +1,69 @@
+import pytest
+import threading
+from sdag.builder import DAGBuilder
+from sdag.callbacks import CallbackLane
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.result import TaskResult
+from sdag.executors import TestExecutor
+
+
+def fail():
+    raise ValueError("boom")
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_callbacks_run_on_lane(workers):
+    seen = []
+    t1 = Task(
+        on_execute=lambda: {"a": 1},
+        name="t1",
+        on_success=lambda res: seen.append(
+            (res.value, threading.current_thread().name)
+        ),
+    )
+    t2 = Task(
+        on_execute=fail,
+        name="t2",
+        on_error=lambda res: seen.append(
+            (type(res.error), threading.current_thread().name)
+        ),
+    )
+    executor = TestExecutor()
+    lane = CallbackLane(workers=workers)
+    dag = DAG(executor=executor, callbacks=lane)
+    DAGBuilder(dag=dag).add_root(t1).add_root(t2).finalize().run()
+    lane.close()
+
+    assert sorted(v for v, _ in seen if isinstance(v, dict)) == [{"a": 1}]
+    assert ValueError in [v for v, _ in seen]
+    prefix = "sdag-callbacks" if workers else "MainThread"
+    assert all(name.startswith(prefix) for _, name in seen)
+    # Callbacks never take executor slots
+    assert sorted(executor.executed) == sorted([t1.id, t2.id])
+
+
+def test_callback_without_argument():
+    calls = []
+    task = Task(
+        on_execute=lambda: {},
+        name="t1",
+        on_success=lambda: calls.append(1),
+        on_error=lambda: calls.append(2),
+    )
+    DAGBuilder(dag=DAG(executor=TestExecutor())).add_root(task).finalize().run()
+
+    assert calls == [1]
+
+
+def test_failing_callback_is_isolated():
+    def bad(res: TaskResult) -> None:
+        raise RuntimeError("callback bug")
+
+    t1 = Task(on_execute=lambda: {"a": 1}, name="t1", on_success=bad)
+    t2 = Task(on_execute=lambda a: {"b": a}, name="t2")
+    DAGBuilder(dag=DAG(executor=TestExecutor())).add_root(t1).add_task(
+        t2
+    ).finalize().run()
+
+    assert t2.output.value == {"b": 1}
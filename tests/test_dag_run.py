@@ -1,8 +1,10 @@
-from sdag.builder import DAGBuilder
+from conftest import DeferredExecutor
+from sdag.builder import DAGBuilder, join, from_edges
 from sdag.dag import DAG
 from sdag.node import Task, Branch
 from sdag.executors import TestExecutor
 from sdag.result import TaskResult
+from sdag.state import TaskState, RunPolicy
 
 def t1():
     print("Executing t1")
@@ -116,3 +118,142 @@ def test_branch_dag():
         for i in executor.executed
     ])
 
+
+
+def noop():
+    return {}
+
+def fail(value: int):
+    raise RuntimeError("branch failed")
+
+
+def build_branch_join(executor, join_policy: RunPolicy, condition=b1):
+    task1 = Task(on_execute=t1, name="Task1")
+    task2 = Task(on_execute=t2, name="Task2")
+    branch1 = Branch(on_execute=condition, name="Branch1", error_branch="Task5")
+    task4 = Task(on_execute=t4, name="Task4")
+    task5 = Task(on_execute=noop, name="Task5", policy=RunPolicy.ALWAYS)
+    task6 = Task(on_execute=noop, name="Task6")
+    task7 = Task(on_execute=noop, name="Task7", policy=join_policy)
+
+    left, right = DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(
+        task1
+    ).add_task(
+        task2
+    ).branch(branch1, n_branches=2)
+
+    join(task7, [left.add_task(task4), right.add_task(task5).add_task(task6)])
+
+    return left.finalize(), (task4, task5, task6, task7)
+
+
+def test_branch_prunes_subtree():
+    executor = TestExecutor()
+    dag, (task4, task5, task6, task7) = build_branch_join(
+        executor, RunPolicy.ONE_SUCCESS
+    )
+    dag.run()
+
+    assert task4.state == TaskState.SUCCESS
+    assert task5.state == TaskState.SKIPPED
+    assert task6.state == TaskState.SKIPPED
+    assert task7.state == TaskState.SUCCESS
+    assert task5.id not in executor.executed
+
+
+def test_join_after_branch_resolves():
+    executor = TestExecutor()
+    dag, (task4, task5, task6, task7) = build_branch_join(
+        executor, RunPolicy.ALL_SUCCESS
+    )
+    dag.run()
+
+    assert task4.state == TaskState.SUCCESS
+    assert task7.state == TaskState.SKIPPED
+    assert not dag._queue
+
+
+def test_failed_branch_routes_to_error_branch():
+    executor = TestExecutor()
+    dag, (task4, task5, task6, task7) = build_branch_join(
+        executor, RunPolicy.ONE_SUCCESS, condition=fail
+    )
+    dag.run()
+
+    assert task4.state == TaskState.SKIPPED
+    assert task5.state == TaskState.SUCCESS
+    assert task6.state == TaskState.SUCCESS
+    assert task7.state == TaskState.SUCCESS
+
+
+def build_unchosen_join(policy: RunPolicy):
+    order = []
+
+    def emit(name: str, value: int = 0):
+        def run():
+            order.append(name)
+            return {"value": value}
+        return run
+
+    def relay(name: str):
+        def run(value: int):
+            order.append(name)
+            return {"value": value}
+        return run
+
+    a = Task(on_execute=emit("a"), name="a")
+    b = Branch(on_execute=lambda: "L", name="b")
+    left = Task(on_execute=emit("L"), name="L")
+    joined = Task(on_execute=relay("J"), name="J", policy=policy)
+    x = Task(on_execute=emit("x", 7), name="x")
+    d1 = Task(on_execute=relay("d1"), name="d1")
+    d2 = Task(on_execute=relay("d2"), name="d2")
+
+    dag = from_edges(
+        DAG(executor=DeferredExecutor()),
+        edges=[
+            (a, b), (b, left), (b, joined),
+            (x, d1), (d1, d2), (d2, joined),
+        ],
+    )
+    dag.run()
+    return order, joined, d2
+
+
+def test_unchosen_join_waits_for_other_parents():
+    order, joined, d2 = build_unchosen_join(RunPolicy.ONE_SUCCESS)
+
+    # b finishes before d2, but b not picking J doesn't count as a success
+    assert joined.state == TaskState.SUCCESS
+    assert order.index("J") > order.index("d2")
+    assert joined.output.value == {"value": 7}
+
+
+def test_unchosen_join_is_skipped_under_all_success():
+    order, joined, d2 = build_unchosen_join(RunPolicy.ALL_SUCCESS)
+
+    assert d2.state == TaskState.SUCCESS
+    assert joined.state == TaskState.SKIPPED
+    assert "J" not in order
+
+
+def test_pruned_subtree_respects_policy():
+    a = Task(on_execute=t1, name="a")
+    b = Branch(on_execute=lambda value: "L", name="b")
+    left = Task(on_execute=noop, name="L")
+    right = Task(on_execute=noop, name="R")
+    below = Task(on_execute=noop, name="below")
+    cleanup = Task(on_execute=noop, name="cleanup", policy=RunPolicy.ALWAYS)
+
+    dag = from_edges(
+        DAG(executor=TestExecutor()),
+        edges=[(a, b), (b, left), (b, right), (right, below), (below, cleanup)],
+    )
+    dag.run()
+
+    assert right.state == TaskState.SKIPPED
+    assert below.state == TaskState.SKIPPED
+    # Same as when `below` is skipped by its own policy
+    assert cleanup.state == TaskState.SUCCESS
@@ -0,0 +1,120 @@
+import os
+import signal
+import time
+import pytest
+from dataclasses import dataclass
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.result import Result
+from sdag.state import TaskState
+from sdag.distributed import DistributedExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+
+@dataclass
+class PidResult(Result):
+    pid: int = 0
+
+
+class Sleep:
+    """Picklable task that reports the pid it ran on."""
+
+    def __init__(self, n: int, seconds: float) -> None:
+        self.n = n
+        self.seconds = seconds
+
+    def __call__(self) -> PidResult:
+        time.sleep(self.seconds)
+        return PidResult(id=self.n, pid=os.getpid())
+
+
+def pid():
+    return {"pid": os.getpid()}
+
+
+def drain(executor: DistributedExecutor, n: int, timeout: float = 20) -> list[Result]:
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < n and time.monotonic() < deadline:
+        results.extend(executor.poll())
+    return results
+
+
+@pytest.fixture
+def executor():
+    executor = DistributedExecutor(heartbeat=0.2, heartbeat_timeout=1.0)
+    yield executor
+    executor.close()
+
+
+def test_dag_on_workers(executor: DistributedExecutor):
+    executor.spawn_workers(3)
+    executor.wait_for_workers(3)
+
+    builder = DAGBuilder(dag=DAG(executor=executor))
+    root = builder.add_root(Task(on_execute=pid, name="root"))
+    children = [Task(on_execute=pid, name=f"c{i}") for i in range(6)]
+    for c in children:
+        root.add_task(c)
+
+    root.finalize().run()
+
+    assert all(c.state == TaskState.SUCCESS for c in children)
+    assert all(c.output.value["pid"] != os.getpid() for c in children)
+
+
+def test_unix_socket(tmp_path):
+    executor = DistributedExecutor(address=str(tmp_path / "sdag.sock"))
+    try:
+        executor.spawn_workers(1)
+        executor.wait_for_workers(1)
+        executor.submit(Sleep(1, 0))
+
+        assert [r.id for r in drain(executor, 1)] == [1]
+    finally:
+        executor.close()
+
+
+def test_idle_worker_steals():
+    executor = DistributedExecutor(prefetch=4)
+    try:
+        executor.spawn_workers(1)
+        executor.wait_for_workers(1)
+        for i in range(4):
+            executor.submit(Sleep(i, 0.5))
+
+        executor.spawn_workers(1)
+        results = drain(executor, 4)
+
+        assert sorted(r.id for r in results) == [0, 1, 2, 3]
+        assert len({r.pid for r in results}) == 2
+    finally:
+        executor.close()
+
+
+def test_silent_worker_is_replaced(executor: DistributedExecutor):
+    executor.spawn_workers(1)
+    executor.wait_for_workers(1)
+    executor.submit(Sleep(1, 0.5))
+
+    # Wait for the task to start, then freeze its worker
+    while not any(j.started for j in executor._jobs.values()):
+        executor.poll()
+    frozen = next(iter(executor._workers.values())).pid
+    os.kill(frozen, signal.SIGSTOP)
+
+    results = drain(executor, 1)
+
+    assert [r.id for r in results] == [1]
+    assert results[0].pid != frozen
+
+
+def test_wrong_authkey_does_not_stop_accepting(executor: DistributedExecutor):
+    with pytest.raises(AuthenticationError):
+        Client(executor.address, authkey=b"wrong")
+
+    executor.spawn_workers(1)
+    executor.wait_for_workers(1)
+    assert executor.workers == 1
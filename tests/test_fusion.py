@@ -0,0 +1,110 @@
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task, Branch
+from sdag.state import TaskState, RunPolicy
+from sdag.executors import TestExecutor
+
+
+def start():
+    return {"value": 1}
+
+def increment(value: int):
+    return {"value": value + 1}
+
+def explode(value: int):
+    raise RuntimeError("boom")
+
+def cleanup():
+    return {"cleaned": True}
+
+def pick(value: int):
+    return "left"
+
+
+def test_chain_is_one_submission():
+    executor = TestExecutor()
+    t1 = Task(on_execute=start, name="t1")
+    t2 = Task(on_execute=increment, name="t2")
+    t3 = Task(on_execute=increment, name="t3")
+
+    DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(
+        t1
+    ).add_task(
+        t2
+    ).add_task(
+        t3
+    ).finalize(fuse=True).run()
+
+    assert executor.executed == [t1.id]
+    assert [t.state for t in (t1, t2, t3)] == [TaskState.SUCCESS] * 3
+    assert t2.output.value == {"value": 2}
+    assert t3.output.value == {"value": 3}
+
+
+def test_chain_failure_respects_policies():
+    executor = TestExecutor()
+    t1 = Task(on_execute=start, name="t1")
+    t2 = Task(on_execute=explode, name="t2")
+    t3 = Task(on_execute=increment, name="t3")
+    t4 = Task(on_execute=cleanup, name="t4", policy=RunPolicy.ALWAYS)
+
+    DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(
+        t1
+    ).add_task(
+        t2
+    ).add_task(
+        t3
+    ).add_task(
+        t4
+    ).finalize(fuse=True).run()
+
+    assert t2.state == TaskState.FAILED
+    assert t3.state == TaskState.SKIPPED
+    assert t4.state == TaskState.SUCCESS
+
+
+def test_branches_are_not_fused():
+    executor = TestExecutor()
+    t1 = Task(on_execute=start, name="t1")
+    t2 = Task(on_execute=increment, name="t2")
+    branch = Branch(on_execute=pick, name="b")
+    left = Task(on_execute=increment, name="left")
+    left_tail = Task(on_execute=increment, name="left_tail")
+    right = Task(on_execute=increment, name="right")
+
+    b1, b2 = DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(
+        t1
+    ).add_task(
+        t2
+    ).branch(branch, n_branches=2)
+    b1.add_task(left).add_task(left_tail)
+    dag = b2.add_task(right).finalize(fuse=True)
+
+    assert {g: dag._groups[g].ids for g in dag._groups} == {
+        t1.id: [t1.id, t2.id],
+        left.id: [left.id, left_tail.id],
+    }
+
+    dag.run()
+
+    assert executor.executed == [t1.id, branch.id, left.id]
+    assert left_tail.output.value == {"value": 4}
+    assert right.state == TaskState.SKIPPED
+
+
+def test_fusion_is_optional():
+    executor = TestExecutor()
+    t1 = Task(on_execute=start, name="t1")
+    t2 = Task(on_execute=increment, name="t2")
+
+    DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(t1).add_task(t2).finalize().run()
+
+    assert executor.executed == [t1.id, t2.id]
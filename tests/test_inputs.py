@@ -0,0 +1,76 @@
+import dill
+from uuid import uuid4
+import pytest
+from sdag.builder import DAGBuilder, join
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.inputs import Conflict
+from sdag.result import TaskResult
+from sdag.state import TaskState
+from sdag.executors import TestExecutor
+from sdag.exceptions import InputConflictError
+
+
+def left():
+    return {"a": 1, "shared": "left"}
+
+def right():
+    return {"b": 2, "shared": "right"}
+
+def combine(a: int, b: int, shared: str):
+    return {"a": a, "b": b, "shared": shared}
+
+
+def run_join(conflict: Conflict) -> Task:
+    t1 = Task(on_execute=left, name="left")
+    t2 = Task(on_execute=right, name="right")
+    t3 = Task(on_execute=combine, name="combine", conflict=conflict)
+
+    builder = DAGBuilder(dag=DAG(executor=TestExecutor()))
+    join(t3, [builder.add_root(t1), builder.add_root(t2)]).finalize().run()
+    return t3
+
+
+def test_join_sees_all_parents():
+    t3 = run_join(Conflict.LAST)
+
+    assert t3.state == TaskState.SUCCESS
+    assert t3.output.value == {"a": 1, "b": 2, "shared": "right"}
+
+
+def test_first_conflict_rule():
+    t3 = run_join(Conflict.FIRST)
+
+    assert t3.output.value["shared"] == "left"
+
+
+def test_error_conflict_rule():
+    t3 = run_join(Conflict.ERROR)
+
+    assert t3.state == TaskState.FAILED
+    assert isinstance(t3.output.error, InputConflictError)
+
+
+def test_input_view_is_read_only():
+    t1 = Task(on_execute=combine, name="t1")
+    big = list(range(1000))
+    t1.add_input(TaskResult(id=t1.id, value={"a": big, "unused": big}))
+
+    view = t1.input
+    assert view["a"] is big
+    assert dict(view) == {"a": big, "unused": big}
+    with pytest.raises(TypeError):
+        view["a"] = 1
+
+
+def test_pickled_task_carries_only_its_inputs():
+    t1 = Task(on_execute=combine, name="t1")
+    t1.add_input(TaskResult(id=uuid4(), value={"a": 1, "unused": "x" * 10_000}))
+    t1.add_input(TaskResult(id=uuid4(), value={"b": 2, "shared": "s"}))
+
+    payload = dill.dumps(t1)
+    clone = dill.loads(payload)
+
+    assert len(payload) < 10_000
+    assert dict(clone.input) == {"a": 1, "b": 2, "shared": "s"}
+    assert clone.name == "t1"
@@ -0,0 +1,129 @@
+import pytest
+from sdag.builder import DAGBuilder
+from sdag.callbacks import CallbackLane
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.state import TaskState
+from sdag.executors import TestExecutor
+
+
+class Blob:
+    """Stands in for a large dataset, counting live copies."""
+    live = 0
+    peak = 0
+
+    def __init__(self) -> None:
+        Blob.live += 1
+        Blob.peak = max(Blob.peak, Blob.live)
+
+    def __del__(self) -> None:
+        Blob.live -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_blobs():
+    Blob.live = Blob.peak = 0
+    yield
+
+
+def source():
+    return {"blob": Blob()}
+
+
+def stage(blob: Blob):
+    return {"blob": Blob()}
+
+
+def chain(n: int, **kwargs) -> tuple[DAG, list[Task]]:
+    tasks = [Task(on_execute=source, name="t0")]
+    tasks += [Task(on_execute=stage, name=f"t{i}") for i in range(1, n)]
+    builder = DAGBuilder(dag=DAG(executor=TestExecutor(), **kwargs)).add_root(tasks[0])
+    for t in tasks[1:]:
+        builder = builder.add_task(t)
+    return builder.finalize(), tasks
+
+
+def test_outputs_kept_by_default():
+    dag, tasks = chain(10)
+    dag.run()
+
+    assert all(t.output is not None for t in tasks)
+    assert Blob.peak == 10
+
+
+def test_release_bounds_live_outputs():
+    dag, tasks = chain(10, release_outputs=True)
+    dag.run()
+
+    assert Blob.peak <= 3
+    assert all(t.output is None for t in tasks[:-1])
+    # Sinks keep their output
+    assert isinstance(tasks[-1].output.value["blob"], Blob)
+
+
+def test_retained_outputs_are_kept():
+    t1 = Task(on_execute=source, name="t1", retain=True)
+    t2 = Task(on_execute=stage, name="t2")
+    t3 = Task(on_execute=stage, name="t3")
+    DAGBuilder(
+        dag=DAG(executor=TestExecutor(), release_outputs=True)
+    ).add_root(t1).add_task(t2).add_task(t3).finalize().run()
+
+    assert t1.output is not None
+    assert t2.output is None
+    assert t3.output is not None
+
+
+def test_fan_out_waits_for_every_consumer():
+    root = Task(on_execute=source, name="root")
+    children = [Task(on_execute=stage, name=f"c{i}") for i in range(3)]
+    builder = DAGBuilder(
+        dag=DAG(executor=TestExecutor(), release_outputs=True)
+    ).add_root(root)
+    for c in children:
+        builder.add_task(c)
+    builder.finalize().run()
+
+    assert all(c.state == TaskState.SUCCESS for c in children)
+    assert root.output is None
+
+
+def test_spilled_outputs_load_from_disk(tmp_path):
+    dag, tasks = chain(3, release_outputs=True, spill_dir=tmp_path)
+    dag.run()
+
+    assert len(list(tmp_path.iterdir())) == 2
+    assert tasks[0].spilled
+    assert isinstance(tasks[0].output.value["blob"], Blob)
+
+
+def test_spill_requires_release(tmp_path):
+    with pytest.raises(ValueError):
+        DAG(executor=TestExecutor(), spill_dir=tmp_path)
+
+
+def test_callbacks_see_released_outputs():
+    seen = []
+    lane = CallbackLane(workers=1)
+    t1 = Task(
+        on_execute=source,
+        name="t1",
+        on_success=lambda res: seen.append(type(res.value["blob"])),
+    )
+    t2 = Task(on_execute=stage, name="t2")
+    DAGBuilder(
+        dag=DAG(executor=TestExecutor(), callbacks=lane, release_outputs=True)
+    ).add_root(t1).add_task(t2).finalize().run()
+    lane.close()
+
+    assert t1.output is None
+    assert seen == [Blob]
+
+
+def test_run_many_releases_per_run():
+    dag, tasks = chain(5, release_outputs=True)
+    runs = list(dag.run_many([{} for _ in range(4)], max_concurrent_runs=2))
+
+    assert len(runs) == 4
+    for r in runs:
+        assert list(r.outputs) == [tasks[-1].id]
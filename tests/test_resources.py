@@ -0,0 +1,77 @@
+import pytest
+from conftest import DeferredExecutor
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.resources import Resources, Capacity
+from sdag.state import TaskState
+from sdag.executors import Executor
+from sdag.exceptions import DAGBuildError
+
+
+def noop():
+    return {}
+
+
+def fan_out(
+    executor: Executor,
+    capacity: Capacity,
+    resources: Resources,
+    width: int,
+) -> list[Task]:
+    root = DAGBuilder(
+        dag=DAG(executor=executor, capacity=capacity)
+    ).add_root(Task(on_execute=noop, name="root"))
+
+    children = [
+        Task(on_execute=noop, name=f"child{i}", resources=resources)
+        for i in range(width)
+    ]
+    for c in children:
+        root.add_task(c)
+
+    root.finalize().run()
+    return children
+
+
+def test_pool_limits_concurrency():
+    executor = DeferredExecutor()
+    children = fan_out(
+        executor,
+        Capacity(pools={"db": 2}),
+        Resources(pools={"db": 1}),
+        width=5,
+    )
+
+    assert executor.max_in_flight == 2
+    assert all(c.state == TaskState.SUCCESS for c in children)
+
+
+def test_memory_limits_concurrency():
+    executor = DeferredExecutor()
+    children = fan_out(
+        executor,
+        Capacity(cpu=8, memory_mb=1000),
+        Resources(memory_mb=300),
+        width=6,
+    )
+
+    assert executor.max_in_flight == 3
+    assert all(c.state == TaskState.SUCCESS for c in children)
+
+
+def test_unlimited_by_default():
+    executor = DeferredExecutor()
+    fan_out(executor, Capacity(), Resources(cpu=4), width=6)
+
+    assert executor.max_in_flight == 6
+
+
+def test_task_larger_than_capacity():
+    with pytest.raises(DAGBuildError):
+        fan_out(
+            DeferredExecutor(),
+            Capacity(cpu=2),
+            Resources(cpu=4),
+            width=1,
+        )
@@ -0,0 +1,99 @@
+import pytest
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.retry import RetryPolicy
+from sdag.state import TaskState
+from sdag.executors import TestExecutor, SequentialExecutor
+from sdag.exceptions import TaskTimeoutError
+
+
+def flaky(failures: int, error: type[Exception] = ConnectionError):
+    calls = []
+    def run():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("downstream unavailable")
+        return {"calls": len(calls)}
+    return run
+
+
+def run_single(task: Task) -> TestExecutor:
+    executor = TestExecutor()
+    DAGBuilder(dag=DAG(executor=executor)).add_root(task).finalize().run()
+    return executor
+
+
+def test_retry_until_success():
+    task = Task(
+        on_execute=flaky(2),
+        name="t1",
+        retry=RetryPolicy(retries=3),
+    )
+    executor = run_single(task)
+
+    assert task.state == TaskState.SUCCESS
+    assert task.output.value == {"calls": 3}
+    assert task.output.attempts == 3
+    # Retries never go back through the executor
+    assert executor.executed == [task.id]
+
+
+def test_retries_exhausted():
+    task = Task(
+        on_execute=flaky(5),
+        name="t1",
+        retry=RetryPolicy(retries=2),
+    )
+    run_single(task)
+
+    assert task.state == TaskState.FAILED
+    assert isinstance(task.output.error, ConnectionError)
+    assert task.output.attempts == 3
+
+
+def test_retry_on_filters_exceptions():
+    task = Task(
+        on_execute=flaky(1, error=ValueError),
+        name="t1",
+        retry=RetryPolicy(retries=2, retry_on=(ConnectionError,)),
+    )
+    run_single(task)
+
+    assert task.state == TaskState.FAILED
+    assert task.output.attempts == 1
+
+
+def test_timeouts_not_retried():
+    policy = RetryPolicy(retries=3)
+
+    assert not policy.should_retry(TaskTimeoutError(), 1)
+    assert policy.should_retry(RuntimeError(), 3)
+    assert not policy.should_retry(RuntimeError(), 4)
+
+
+def test_backoff_delays():
+    policy = RetryPolicy(retries=5, backoff=1.0, multiplier=2.0, max_backoff=5.0)
+
+    assert [policy.delay(i) for i in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+    jittered = RetryPolicy(retries=1, backoff=1.0, jitter=0.5)
+    assert all(0.5 <= jittered.delay(1) <= 1.5 for _ in range(20))
+
+    with pytest.raises(ValueError):
+        RetryPolicy(jitter=2.0)
+
+
+def test_timeout_during_backoff():
+    task = Task(
+        on_execute=flaky(5),
+        name="t1",
+        timeout=0.3,
+        retry=RetryPolicy(retries=3, backoff=0.2),
+    )
+    DAGBuilder(dag=DAG(executor=SequentialExecutor())).add_root(task).finalize().run()
+
+    # Fails at 0s and 0.2s, then times out in the second backoff
+    assert task.state == TaskState.FAILED
+    assert isinstance(task.output.error, TaskTimeoutError)
+    assert task.output.attempts == 2
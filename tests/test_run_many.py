@@ -0,0 +1,166 @@
+import time
+import pytest
+from conftest import DeferredExecutor
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task, Branch
+from sdag.resources import Resources, Capacity
+from sdag.result import TaskResult
+from sdag.state import TaskState
+from sdag.executors import Executor, TestExecutor, PathosExecutor
+
+
+def load(x: int):
+    if x < 0:
+        raise ValueError("negative input")
+    return {"y": x + 1}
+
+
+def double(y: int):
+    return {"z": y * 2}
+
+
+def nap(x: int):
+    time.sleep(x)
+    return {"y": x}
+
+
+def parity(y: int):
+    return "even" if y % 2 == 0 else "odd"
+
+
+def build(
+    executor: Executor,
+    capacity: Capacity | None = None,
+    resources: Resources | None = None,
+) -> tuple[DAG, Task, Task]:
+    t1 = Task(on_execute=load, name="load", resources=resources)
+    t2 = Task(on_execute=double, name="double", resources=resources)
+    dag = DAGBuilder(
+        dag=DAG(executor=executor, capacity=capacity)
+    ).add_root(t1).add_task(t2).finalize()
+    return dag, t1, t2
+
+
+def test_runs_every_input():
+    dag, t1, t2 = build(TestExecutor())
+    runs = list(dag.run_many([{"x": i} for i in range(20)], max_concurrent_runs=4))
+
+    assert sorted(r.index for r in runs) == list(range(20))
+    for r in runs:
+        assert r.input == {"x": r.index}
+        assert r.outputs[t2.id].value == {"z": (r.index + 1) * 2}
+        assert not r.failed
+    # The DAG's own nodes are left alone
+    assert t2.output is None
+
+
+def test_runs_share_the_executor():
+    executor = DeferredExecutor()
+    dag, _, _ = build(executor)
+    runs = list(dag.run_many([{"x": i} for i in range(10)], max_concurrent_runs=5))
+
+    assert len(runs) == 10
+    assert executor.max_in_flight == 5
+
+
+def test_inputs_read_lazily():
+    consumed = []
+
+    def inputs():
+        for i in range(10):
+            consumed.append(i)
+            yield {"x": i}
+
+    dag, _, _ = build(DeferredExecutor())
+    runs = dag.run_many(inputs(), max_concurrent_runs=2)
+    next(runs)
+
+    assert len(consumed) <= 3
+
+
+def test_failures_stay_in_their_run():
+    dag, t1, t2 = build(TestExecutor())
+    runs = {r.index: r for r in dag.run_many([{"x": 1}, {"x": -1}, {"x": 2}])}
+
+    assert runs[1].failed
+    assert runs[1].states[t1.id] == TaskState.FAILED
+    assert runs[1].states[t2.id] == TaskState.SKIPPED
+    assert not runs[0].failed and not runs[2].failed
+
+
+def test_branches_route_per_run():
+    t1 = Task(on_execute=load, name="load")
+    branch = Branch(on_execute=parity, name="parity")
+    even = Task(on_execute=lambda: {"even": True}, name="even")
+    odd = Task(on_execute=lambda: {"odd": True}, name="odd")
+    left, right = DAGBuilder(dag=DAG(executor=TestExecutor())).add_root(
+        t1
+    ).branch(branch, 2)
+    left.add_task(even)
+    dag = right.add_task(odd).finalize()
+
+    for r in dag.run_many([{"x": i} for i in range(6)]):
+        picked, skipped = (odd, even) if r.index % 2 == 0 else (even, odd)
+        assert r.states[picked.id] == TaskState.SUCCESS
+        assert r.states[skipped.id] == TaskState.SKIPPED
+
+
+def test_capacity_shared_across_runs():
+    executor = DeferredExecutor()
+    dag, _, _ = build(
+        executor,
+        capacity=Capacity(pools={"db": 2}),
+        resources=Resources(pools={"db": 1}),
+    )
+    runs = list(dag.run_many([{"x": i} for i in range(8)], max_concurrent_runs=8))
+
+    assert len(runs) == 8
+    assert executor.max_in_flight == 2
+
+
+def test_run_many_on_pathos():
+    executor = PathosExecutor(workers=2)
+    try:
+        dag, _, t2 = build(executor)
+        runs = list(dag.run_many([{"x": i} for i in range(8)], max_concurrent_runs=4))
+    finally:
+        executor.close()
+
+    assert sorted(r.outputs[t2.id].value["z"] for r in runs) == [
+        (i + 1) * 2 for i in range(8)
+    ]
+
+
+def test_concurrency_must_be_positive():
+    dag, _, _ = build(TestExecutor())
+    with pytest.raises(ValueError):
+        next(dag.run_many([{"x": 1}], max_concurrent_runs=0))
+
+
+def test_abandoned_runs_do_not_leak_into_run():
+    executor = PathosExecutor(workers=2)
+    try:
+        t1 = Task(on_execute=nap, name="nap")
+        t2 = Task(on_execute=double, name="double")
+        dag = DAGBuilder(dag=DAG(executor=executor)).add_root(t1).add_task(
+            t2
+        ).finalize()
+
+        runs = dag.run_many([{"x": 0}, {"x": 0.5}], max_concurrent_runs=2)
+        first = next(runs)
+        # The second run's task is still on the executor
+        runs.close()
+
+        assert first.index == 0
+        assert not dag._admission._held
+
+        t1.input = TaskResult(id=t1.id, value={"x": 0})
+        dag.run()
+    finally:
+        executor.close()
+
+    assert t1.state == TaskState.SUCCESS
+    assert t1.output.value == {"y": 0}
+    assert t2.state == TaskState.SUCCESS
+    assert t2.output.value == {"z": 0}
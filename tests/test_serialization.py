@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.state import TaskState
+from sdag.executors import PathosExecutor
+from sdag.distributed import DistributedExecutor
+from sdag.serialization import (
+    PickleSerializer,
+    CloudpickleSerializer,
+    DillSerializer,
+    SerializationStats,
+    _Payload,
+)
+
+
+def make_array():
+    return {"array": np.arange(100_000)}
+
+
+def total(array: np.ndarray):
+    return {"total": int(array.sum())}
+
+
+def test_pickle_keeps_buffers_out_of_band():
+    array = np.arange(100_000)
+    data, buffers = PickleSerializer().dumps({"array": array})
+
+    assert len(data) < 1_000
+    assert sum(b.nbytes for b in buffers) == array.nbytes
+    loaded = PickleSerializer().loads(data, buffers)
+    assert np.array_equal(loaded["array"], array)
+
+
+def test_dill_serializes_closures():
+    offset = 3
+    data, buffers = DillSerializer().dumps(lambda x: x + offset)
+
+    assert buffers == []
+    assert DillSerializer().loads(data)(1) == 4
+
+
+def test_cloudpickle_serializes_closures():
+    pytest.importorskip("cloudpickle")
+    offset = 3
+    data, buffers = CloudpickleSerializer().dumps(lambda x: x + offset)
+
+    assert PickleSerializer().loads(data, buffers)(1) == 4
+
+
+def test_payload_records_stats():
+    stats = SerializationStats()
+    payload = _Payload.dump(PickleSerializer(), np.arange(1_000), stats)
+    payload.load(stats)
+
+    assert stats.payloads == 1
+    assert stats.out_of_band_bytes == 8_000
+    assert stats.bytes_deserialized == stats.bytes_serialized + 8_000
+
+
+def build(executor, **kwargs) -> tuple[DAG, Task, Task]:
+    t1 = Task(on_execute=make_array, name="t1")
+    t2 = Task(on_execute=total, name="t2", **kwargs)
+    dag = DAG(executor=executor, serializer=PickleSerializer())
+    DAGBuilder(dag=dag).add_root(t1).add_task(t2).finalize()
+    return dag, t1, t2
+
+
+def test_pathos_with_serializer():
+    executor = PathosExecutor(workers=2)
+    try:
+        dag, _, t2 = build(executor)
+        dag.run()
+    finally:
+        executor.close()
+
+    assert t2.output.value == {"total": int(np.arange(100_000).sum())}
+    # The array went out to t2 and back from t1 out of band
+    assert executor.stats.payloads == 2
+    assert executor.stats.out_of_band_bytes >= 800_000
+
+
+def test_task_overrides_dag_serializer():
+    executor = PathosExecutor(workers=2)
+    offset = 1
+    try:
+        t1 = Task(on_execute=make_array, name="t1")
+        t2 = Task(
+            on_execute=lambda array: {"total": int(array.sum()) + offset},
+            name="t2",
+            serializer=DillSerializer(),
+        )
+        dag = DAG(executor=executor, serializer=PickleSerializer())
+        DAGBuilder(dag=dag).add_root(t1).add_task(t2).finalize().run()
+    finally:
+        executor.close()
+
+    assert t2.state == TaskState.SUCCESS
+    assert t2.output.value == {"total": int(np.arange(100_000).sum()) + 1}
+
+
+def test_distributed_with_serializer():
+    executor = DistributedExecutor(heartbeat=0.2, heartbeat_timeout=1.0)
+    try:
+        executor.spawn_workers(1)
+        executor.wait_for_workers(1)
+        dag, _, t2 = build(executor)
+        dag.run()
+    finally:
+        executor.close()
+
+    assert t2.output.value == {"total": int(np.arange(100_000).sum())}
+    assert executor.stats.out_of_band_bytes >= 800_000
+
+
+def test_callbacks_stay_on_the_coordinator():
+    seen = []
+    executor = PathosExecutor(workers=1)
+    try:
+        t1 = Task(
+            on_execute=make_array,
+            name="t1",
+            on_success=lambda: seen.append("t1"),
+        )
+        dag = DAG(executor=executor, serializer=PickleSerializer())
+        DAGBuilder(dag=dag).add_root(t1).finalize().run()
+    finally:
+        executor.close()
+
+    assert t1.state == TaskState.SUCCESS
+    assert seen == ["t1"]
+
+
+@pytest.mark.parametrize("distributed", [False, True])
+def test_unserializable_task_fails(distributed):
+    if distributed:
+        executor = DistributedExecutor(heartbeat=0.2, heartbeat_timeout=1.0)
+        executor.spawn_workers(1)
+        executor.wait_for_workers(1)
+    else:
+        executor = PathosExecutor(workers=1)
+    try:
+        t1 = Task(on_execute=lambda: {"a": 1}, name="t1")
+        t2 = Task(on_execute=total, name="t2")
+        dag = DAG(executor=executor, serializer=PickleSerializer())
+        DAGBuilder(dag=dag).add_root(t1).add_task(t2).finalize().run()
+    finally:
+        executor.close()
+
+    assert t1.state == TaskState.FAILED
+    assert isinstance(t1.output.error, Exception)
+    assert t2.state == TaskState.SKIPPED
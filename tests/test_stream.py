@@ -0,0 +1,186 @@
+import time
+import threading
+import pytest
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.state import TaskState
+from sdag.executors import TestExecutor, SequentialExecutor
+from sdag.stream import _Pipeline
+from sdag.exceptions import DAGBuildError
+
+
+def build(*tasks: Task) -> TestExecutor:
+    executor = TestExecutor()
+    b = DAGBuilder(dag=DAG(executor=executor)).add_root(tasks[0])
+    for t in tasks[1:]:
+        b = b.add_task(t)
+    b.finalize().run()
+    return executor
+
+
+def test_pipeline_streams_chunks():
+    events = []
+
+    def read():
+        for i in range(5):
+            events.append(("read", i))
+            yield {"line": i}
+        return {"lines": 5}
+
+    def double(stream):
+        for chunk in stream:
+            events.append(("double", chunk["line"]))
+            yield {"line": chunk["line"] * 2}
+
+    def total(stream):
+        return {"total": sum(c["line"] for c in stream)}
+
+    def report(total: int):
+        return {"report": f"total={total}"}
+
+    t1 = Task(on_execute=read, name="read")
+    t2 = Task(on_execute=double, name="double", buffer_size=1)
+    t3 = Task(on_execute=total, name="total", buffer_size=1)
+    t4 = Task(on_execute=report, name="report")
+    executor = build(t1, t2, t3, t4)
+
+    assert [t.state for t in (t1, t2, t3, t4)] == [TaskState.SUCCESS] * 4
+    assert t1.output.value == {"lines": 5}
+    assert t4.output.value == {"report": "total=20"}
+    # The whole pipeline is one submission
+    assert executor.executed == [t1.id, t4.id]
+    # Stages overlap rather than running one after another
+    assert events.index(("double", 0)) < events.index(("read", 4))
+
+
+def test_backpressure():
+    produced = []
+    lead = []
+
+    def produce():
+        for i in range(30):
+            produced.append(i)
+            yield {"i": i}
+
+    def consume(stream):
+        seen = 0
+        for _ in stream:
+            seen += 1
+            lead.append(len(produced) - seen)
+            time.sleep(0.001)
+        return {"seen": seen}
+
+    t1 = Task(on_execute=produce, name="produce")
+    t2 = Task(on_execute=consume, name="consume", buffer_size=2)
+    build(t1, t2)
+
+    assert t2.output.value == {"seen": 30}
+    assert max(lead) <= 4
+
+
+def test_upstream_failure_skips_stages():
+    def produce():
+        yield {"i": 0}
+        raise IOError("disk gone")
+
+    def consume(stream):
+        for _ in stream:
+            yield {}
+
+    t1 = Task(on_execute=produce, name="produce")
+    t2 = Task(on_execute=consume, name="consume")
+    build(t1, t2)
+
+    assert t1.state == TaskState.FAILED
+    assert t2.state == TaskState.SKIPPED
+
+
+def test_consumer_stops_early():
+    produced = []
+
+    def produce():
+        for i in range(1000):
+            produced.append(i)
+            yield {"i": i}
+
+    def head(stream):
+        first = [c["i"] for _, c in zip(range(3), stream)]
+        return {"first": first}
+
+    t1 = Task(on_execute=produce, name="produce")
+    t2 = Task(on_execute=head, name="head", buffer_size=1)
+    build(t1, t2)
+
+    assert t1.state == TaskState.SUCCESS
+    assert t2.output.value == {"first": [0, 1, 2]}
+    assert len(produced) < 1000
+
+
+def test_stream_needs_streaming_parent():
+    def produce():
+        return {}
+
+    def consume(stream):
+        yield from stream
+
+    with pytest.raises(DAGBuildError):
+        build(
+            Task(on_execute=produce, name="produce"),
+            Task(on_execute=consume, name="consume"),
+        )
+
+
+def test_plain_consumer_after_generator_consumer():
+    def produce():
+        yield {"i": 1}
+        yield {"i": 2}
+
+    def passthrough(stream):
+        yield from stream
+
+    def sink(stream):
+        return {"total": sum(c["i"] for c in stream)}
+
+    t1 = Task(on_execute=produce, name="produce")
+    t2 = Task(on_execute=passthrough, name="passthrough")
+    t3 = Task(on_execute=sink, name="sink")
+    executor = build(t1, t2, t3)
+
+    assert t3.output.value == {"total": 3}
+    assert executor.executed == [t1.id]
+
+
+def test_cancelled_pipeline_stops_its_threads():
+    def produce():
+        yield {"i": 0}
+        for _ in range(10):
+            time.sleep(0.05)
+
+    def consume(stream):
+        return {"seen": len(list(stream))}
+
+    before = set(threading.enumerate())
+    t1 = Task(on_execute=produce, name="produce", timeout=0.2)
+    t2 = Task(on_execute=consume, name="consume", timeout=0.2)
+    b = DAGBuilder(dag=DAG(executor=SequentialExecutor())).add_root(t1)
+    b.add_task(t2).finalize().run()
+
+    assert t1.state == TaskState.FAILED
+    deadline = time.monotonic() + 2
+    while set(threading.enumerate()) - before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not set(threading.enumerate()) - before
+
+
+def test_pipeline_timeout_is_longest_stage():
+    def produce():
+        yield {}
+
+    def consume(stream):
+        return {}
+
+    t1 = Task(on_execute=produce, name="produce", timeout=0.2)
+    t2 = Task(on_execute=consume, name="consume", timeout=0.3)
+
+    assert _Pipeline([t1, t2]).timeout == 0.3
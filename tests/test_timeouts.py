@@ -0,0 +1,115 @@
+import time
+import pytest
+from uuid import uuid4
+from sdag.builder import DAGBuilder
+from sdag.dag import DAG
+from sdag.node import Task
+from sdag.state import TaskState, RunPolicy
+from sdag.executors import SequentialExecutor, PathosExecutor, TestExecutor
+from sdag.result import TaskResult
+from sdag.exceptions import TaskTimeoutError
+
+def quick():
+    return {"value": 1}
+
+def hang(value: int):
+    time.sleep(30)
+    return {"value": value}
+
+def stubborn(value: int):
+    try:
+        time.sleep(30)
+    except TaskTimeoutError:
+        time.sleep(30)
+    return {"value": value}
+
+def cleanup():
+    return {"cleaned": True}
+
+
+def test_timeout_fails_task():
+    task1 = Task(on_execute=quick, name="t1")
+    task2 = Task(on_execute=hang, name="t2", timeout=0.1)
+    task3 = Task(on_execute=quick, name="t3")
+    task4 = Task(on_execute=cleanup, name="t4", policy=RunPolicy.ALL_DONE)
+
+    DAGBuilder(
+        dag=DAG(executor=SequentialExecutor())
+    ).add_root(
+        task1
+    ).add_task(
+        task2
+    ).add_task(
+        task3
+    ).add_task(
+        task4
+    ).finalize().run()
+
+    assert task2.state == TaskState.FAILED
+    assert isinstance(task2.output.error, TaskTimeoutError)
+    assert task3.state == TaskState.SKIPPED
+    assert task4.state == TaskState.SKIPPED
+
+
+def test_timeout_downstream_policy():
+    task1 = Task(on_execute=quick, name="t1")
+    task2 = Task(on_execute=hang, name="t2", timeout=0.1)
+    task3 = Task(on_execute=cleanup, name="t3", policy=RunPolicy.ONE_FAILED)
+
+    DAGBuilder(
+        dag=DAG(executor=SequentialExecutor())
+    ).add_root(
+        task1
+    ).add_task(
+        task2
+    ).add_task(
+        task3
+    ).finalize().run()
+
+    assert task2.state == TaskState.FAILED
+    assert task3.state == TaskState.SUCCESS
+
+
+def test_timeout_kills_stuck_worker():
+    executor = PathosExecutor(workers=1, kill_grace=0.2)
+    task1 = Task(on_execute=quick, name="t1")
+    task2 = Task(on_execute=stubborn, name="t2", timeout=0.2)
+
+    start = time.monotonic()
+    DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(
+        task1
+    ).add_task(
+        task2
+    ).finalize().run()
+
+    assert time.monotonic() - start < 10
+    assert task2.state == TaskState.FAILED
+    assert isinstance(task2.output.error, TaskTimeoutError)
+
+    # The killed worker is replaced, so the pool keeps working
+    task3 = Task(on_execute=quick, name="t3")
+    DAGBuilder(
+        dag=DAG(executor=executor)
+    ).add_root(task3).finalize().run()
+
+    assert task3.state == TaskState.SUCCESS
+    executor.close()
+
+
+@pytest.mark.parametrize("executor", [SequentialExecutor(), TestExecutor()])
+def test_in_process_executors_use_fallback(executor):
+    task_id = uuid4()
+
+    def escapes():
+        raise TaskTimeoutError("escaped the task")
+
+    executor.submit(
+        escapes,
+        fallback=lambda e: TaskResult(id=task_id, error=e),
+    )
+    [res] = executor.poll()
+
+    assert res.id == task_id
+    assert isinstance(res.error, TaskTimeoutError)